@@ -118,3 +118,14 @@ async def get_admin_access(
         status_code=status.HTTP_403_FORBIDDEN,
         detail="Not authorized — provide a valid JWT with admin role or X-Admin-Key",
     )
+
+
+async def get_admin_optional(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    admin_key: str = Security(admin_key_header),
+) -> Optional[dict]:
+    """The admin identity if the request carries valid admin credentials, else None."""
+    try:
+        return await get_admin_access(credentials, admin_key)
+    except HTTPException:
+        return None
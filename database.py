@@ -1,8 +1,16 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 
 from dotenv import load_dotenv
 
@@ -12,16 +20,105 @@ load_dotenv()
 _use_local = os.getenv("USE_LOCAL_DB", "").lower() == "true"
 _db_url = os.getenv("SUPABASE_DATABASE_URL") or os.getenv("DATABASE_URL")
 
+# Postgres connection pooling, picked per deployment via DB_POOL_MODE:
+#   null        - no client pool; every checkout opens a new connection.
+#                 Right for serverless (Vercel), where the process can be
+#                 frozen between invocations and held connections go stale.
+#   queue       - persistent QueuePool per worker process (uvicorn/Procfile).
+#                 Skips the TCP+TLS+auth handshake on every request.
+#   transaction - QueuePool in front of a transaction-mode pooler (Supabase
+#                 :6543 / PgBouncer). Server-side prepared statements are
+#                 disabled because consecutive transactions can land on
+#                 different backends.
+POOL_MODES = ("null", "queue", "transaction")
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "null").lower()
+if DB_POOL_MODE not in POOL_MODES:
+    raise RuntimeError(
+        f"DB_POOL_MODE must be one of {', '.join(POOL_MODES)}, got {DB_POOL_MODE!r}"
+    )
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+
+class _TimedPoolMixin:
+    """Times every checkout so pool_stats() can report connection wait.
+
+    For QueuePool this is time spent waiting for a free slot (plus connect
+    time on overflow); for NullPool it is the full connect handshake.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedNullPool(_TimedPoolMixin, NullPool):
+    pass
+
+
+def _pool_options(mode: str, is_async: bool = False) -> dict:
+    if mode == "null":
+        return {"poolclass": TimedNullPool, "pool_pre_ping": True}
+    return {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+
+def _track_checked_out(engine):
+    """Count live checkouts for pools that don't expose checkedout() (NullPool)."""
+    engine.pool.checked_out_count = 0
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        engine.pool.checked_out_count += 1
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        engine.pool.checked_out_count -= 1
+
+    return engine
+
+
 if _use_local:
     # Local development - SQLite
     DATABASE_URL = "sqlite:///./ev_local.db"
     engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 elif _db_url:
     DATABASE_URL = _db_url.replace("postgres://", "postgresql://", 1)
-    engine = create_engine(
-        DATABASE_URL,
-        poolclass=NullPool,
-        pool_pre_ping=True,
+    # psycopg2 never uses server-side prepared statements, so transaction
+    # mode needs no extra connect args on the sync engine.
+    engine = _track_checked_out(
+        create_engine(DATABASE_URL, **_pool_options(DB_POOL_MODE))
     )
 else:
     # Fallback to SQLite if no DATABASE_URL
@@ -30,6 +127,151 @@ else:
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_engine_args(url: str):
+    """Same database through an async driver: asyncpg for Postgres, aiosqlite
+    for SQLite. Returns (url, connect_args)."""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite"), {"check_same_thread": False}
+    query = dict(url.query)
+    connect_args = {}
+    # asyncpg doesn't understand libpq's sslmode; it takes the same values as `ssl`
+    sslmode = query.pop("sslmode", None)
+    if sslmode and sslmode != "disable":
+        connect_args["ssl"] = sslmode
+    if DB_POOL_MODE == "transaction":
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        # asyncpg still prepares named statements; unique names keep them
+        # from colliding on pooled backends ("prepared statement ... already
+        # exists"), per the SQLAlchemy asyncpg docs for PgBouncer
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    return url.set(drivername="postgresql+asyncpg", query=query), connect_args
+
+
+def _create_async_engine(url: str):
+    async_url, connect_args = _async_engine_args(url)
+    if async_url.get_backend_name() != "postgresql":
+        return create_async_engine(async_url, connect_args=connect_args)
+    async_engine = create_async_engine(
+        async_url,
+        connect_args=connect_args,
+        **_pool_options(DB_POOL_MODE, is_async=True),
+    )
+    _track_checked_out(async_engine.sync_engine)
+    return async_engine
+
+
+# Async engine for the read paths that run on the event loop. Both engines
+# point at the same database; sync routes keep using SessionLocal.
+async_engine = _create_async_engine(DATABASE_URL)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+class ReadOnlySession(Session):
+    """Session for replica reads — flushing pending changes is a bug."""
+
+    def flush(self, objects=None):
+        raise RuntimeError("Read-only session: writes must go through get_db")
+
+
+# Public catalog reads go to DATABASE_READ_URL (a streaming replica) when
+# set, keeping them off the primary that serves admin writes, proposal
+# ingestion and newsletter inserts. Without it, reads share the primary.
+_read_url = os.getenv("DATABASE_READ_URL")
+if _read_url and not _use_local:
+    DATABASE_READ_URL = _read_url.replace("postgres://", "postgresql://", 1)
+    async_read_engine = _create_async_engine(DATABASE_READ_URL)
+else:
+    DATABASE_READ_URL = None
+    async_read_engine = async_engine
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine,
+    sync_session_class=ReadOnlySession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
 metadata = Base.metadata
+
+
+def pool_stats(target=None) -> dict:
+    """Snapshot of an engine's connection pool for the admin status endpoint."""
+    target = target or engine
+    target = getattr(target, "sync_engine", target)
+    pool = target.pool
+    mode = DB_POOL_MODE if target.dialect.name == "postgresql" else "local"
+    stats = {"mode": mode, "pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    else:
+        stats["checked_out"] = getattr(pool, "checked_out_count", None)
+    checkouts = getattr(pool, "checkouts", None)
+    if checkouts is not None:
+        stats.update(
+            checkouts=checkouts,
+            wait_ms_total=round(pool.wait_total * 1000, 2),
+            wait_ms_max=round(pool.wait_max * 1000, 2),
+            wait_ms_avg=round(pool.wait_total * 1000 / checkouts, 2) if checkouts else 0.0,
+        )
+    return stats
+
+
+# --- Per-request SQL instrumentation ---
+# middleware.SQLTimingMiddleware installs a QueryStats per request; cursor
+# events on every engine add to it. Outside a request (scripts, background
+# refreshes) there is no QueryStats and the hooks only keep their timers.
+
+class QueryStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += time.perf_counter() - started
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(target):
+    target = getattr(target, "sync_engine", target)
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target, "handle_error", _handle_error)
+
+
+for _target in {engine, async_engine.sync_engine, async_read_engine.sync_engine}:
+    instrument_engine(_target)
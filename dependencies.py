@@ -6,12 +6,14 @@ Access control lives in auth.py:
 - Writes and admin reads require get_admin_access (JWT admin role or X-Admin-Key).
 """
 
-from typing import Annotated, Optional, Dict
+from typing import Annotated, Optional
 
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from database import SessionLocal
+from auth import get_admin_optional
+from database import AsyncReadSessionLocal, AsyncSessionLocal, SessionLocal
 
 from dotenv import load_dotenv
 
@@ -19,8 +21,40 @@ load_dotenv()
 
 # --- Database dependency ---
 
+class LazySession:
+    """Stands in for a Session and only creates it on first attribute access.
+
+    Handlers that return early — cache hits, 304s, the newsletter honeypot,
+    validation 404s — never open a session, so they never check out a
+    connection either.
+    """
+
+    def __init__(self, session_factory):
+        self._session_factory = session_factory
+        self._session = None
+
+    def __getattr__(self, name):
+        if self._session is None:
+            self._session = self._session_factory()
+        return getattr(self._session, name)
+
+    @property
+    def opened(self) -> bool:
+        return self._session is not None
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+
+class LazyAsyncSession(LazySession):
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
 def get_db():
-    db = SessionLocal()
+    db = LazySession(SessionLocal)
     try:
         yield db
     finally:
@@ -29,24 +63,33 @@ def get_db():
 db_dependency = Annotated[Session, Depends(get_db)]
 
 
-# --- Helper functions ---
+# Async session for read routes: queries are awaited instead of blocking the
+# event loop. Relationships must be eager-loaded (no lazy loads under asyncio).
+async def get_async_db():
+    db = LazyAsyncSession(AsyncSessionLocal)
+    try:
+        yield db
+    finally:
+        await db.close()
 
-def calculate_average_rating(ratings: Optional[Dict[str, float]]) -> Optional[float]:
-    """Average review scores normalized to a /10 scale.
+async_db_dependency = Annotated[AsyncSession, Depends(get_async_db)]
 
-    Source data mixes scales (Edmunds/US News use /10: 7.1-9.4; Car and
-    Driver/Consumer Reports entries were stored as /5: 4.0-4.7) and contains
-    0.0 placeholders. Values <= 5 are treated as /5 and doubled; <= 0 entries
-    are dropped. Returns None (not 0) when there's no usable data so the UI
-    can hide the badge instead of showing a broken-looking red zero.
-    """
-    if not ratings:
-        return None
-    normalized = []
-    for value in ratings.values():
-        if value is None or value <= 0:
-            continue
-        normalized.append(min(value * 2, 10.0) if value <= 5 else min(value, 10.0))
-    if not normalized:
-        return None
-    return round(sum(normalized) / len(normalized), 1)
+
+# Read-only session for public catalog GETs, served by the replica when
+# DATABASE_READ_URL is set. Replicas lag the primary slightly, so admin
+# flows that read right after a write (edit a car, reload it) go to the
+# primary: any request that resolves to an admin, by JWT or X-Admin-Key.
+# Everyone else reads the replica.
+def wants_primary(admin: Optional[dict]) -> bool:
+    return admin is not None
+
+
+async def get_read_db(admin: Optional[dict] = Depends(get_admin_optional)):
+    session_factory = AsyncSessionLocal if wants_primary(admin) else AsyncReadSessionLocal
+    db = LazyAsyncSession(session_factory)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+read_db_dependency = Annotated[AsyncSession, Depends(get_read_db)]
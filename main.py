@@ -1,7 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from routers import cars, makes, people, admin, user_routes, seo, newsletter, proposals
+from middleware import CompressionMiddleware, SQLTimingMiddleware
+from routers import (
+    cars, makes, people, admin, user_routes, seo, newsletter, proposals, search, compare,
+    best,
+)
 
 app = FastAPI()
 
@@ -32,8 +36,15 @@ app.add_middleware(
         "X-Admin-Key",
         "access_token_ev_lineup",
     ],
+    # Cursor pagination on bare-list endpoints (utils/pagination.py)
+    expose_headers=["X-Next-Cursor", "Link"],
 )
 
+app.add_middleware(SQLTimingMiddleware)
+# Compresses everything else over the threshold; pre-compressed catalog
+# payloads already carry Content-Encoding and pass through untouched.
+app.add_middleware(CompressionMiddleware)
+
 # Register routers
 app.include_router(cars.router)
 app.include_router(makes.router)
@@ -43,6 +54,9 @@ app.include_router(user_routes.router)
 app.include_router(seo.router)
 app.include_router(newsletter.router)
 app.include_router(proposals.router)
+app.include_router(search.router)
+app.include_router(compare.router)
+app.include_router(best.router)
 
 
 @app.get("/")
@@ -0,0 +1,163 @@
+"""ASGI middleware shared by every route."""
+
+import json
+import logging
+import os
+import time
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database import QueryStats, current_query_stats
+from utils.http_cache import (
+    COMPRESS_MIN_SIZE, PER_REQUEST_LEVELS, choose_encoding, compress, weak_etag,
+)
+
+logger = logging.getLogger("ev.sql")
+
+# Snapshot-backed routes (services/catalog.py) run 0 queries when warm and
+# 4 on the request that loads the snapshot.
+SNAPSHOT_LOAD_QUERIES = 4
+
+# Query budgets per "METHOD route-path-template". Going over logs a warning
+# (the request still succeeds) so N+1 regressions show up in the logs
+# before they show up in p95. Routes not listed fall back to
+# SQL_QUERY_BUDGET, unset = no budget.
+QUERY_BUDGETS = {
+    "GET /cars/cards": SNAPSHOT_LOAD_QUERIES,
+    "GET /cars/model-reps": SNAPSHOT_LOAD_QUERIES,
+    "GET /cars/search": SNAPSHOT_LOAD_QUERIES,
+    "GET /cars": SNAPSHOT_LOAD_QUERIES,
+    "GET /cars/batch": 1,
+    "GET /cars/by-slug/{full_slug}": 1,
+    "GET /cars/{car_id}": 1,
+    "GET /cars/{car_id}/similar": SNAPSHOT_LOAD_QUERIES,
+    "GET /cars/submodels/{make_model_slug}": 1,
+    "GET /cars/model-details/{make_model_slug}": 1,
+    "GET /car_features": SNAPSHOT_LOAD_QUERIES,
+    "GET /makes": SNAPSHOT_LOAD_QUERIES,
+    "GET /makes/{make_id}": 1,
+    "GET /makes/by-slug/{slug}/lineup": SNAPSHOT_LOAD_QUERIES + 1,
+    "GET /people": 1,
+    "GET /sitemap.xml": SNAPSHOT_LOAD_QUERIES,
+    "GET /search/suggest": SNAPSHOT_LOAD_QUERIES,
+    "GET /compare": SNAPSHOT_LOAD_QUERIES,
+    "GET /best/{list_key}": SNAPSHOT_LOAD_QUERIES,
+}
+DEFAULT_QUERY_BUDGET = int(os.getenv("SQL_QUERY_BUDGET", "0")) or None
+
+
+class SQLTimingMiddleware:
+    """Counts queries and DB time per request.
+
+    Results go out as a Server-Timing header (visible in browser devtools)
+    and as one JSON log line per request on the "ev.sql" logger.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                total_ms = (time.perf_counter() - started) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries", '
+                    f"app;dur={total_ms:.1f}",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            self._log(scope, status_code, stats, time.perf_counter() - started)
+
+    @staticmethod
+    def _log(scope: Scope, status_code: int, stats: QueryStats, elapsed: float) -> None:
+        route = scope.get("route")
+        route_path = getattr(route, "path", None)
+        record = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route_path,
+            "status": status_code,
+            "queries": stats.count,
+            "db_ms": round(stats.seconds * 1000, 2),
+            "total_ms": round(elapsed * 1000, 2),
+        }
+        logger.info(json.dumps(record))
+        budget = QUERY_BUDGETS.get(f"{scope['method']} {route_path}", DEFAULT_QUERY_BUDGET)
+        if budget is not None and stats.count > budget:
+            logger.warning(
+                "query budget exceeded: %s %s ran %d queries (budget %d)",
+                scope["method"], route_path, stats.count, budget,
+            )
+
+
+class CompressionMiddleware:
+    """gzip/brotli for responses that weren't pre-compressed by the route.
+
+    Replaces Starlette's GZipMiddleware, which only does gzip and ignores
+    q=0 in Accept-Encoding. Responses that already carry Content-Encoding
+    (utils.http_cache.encoded_response), streaming bodies and bodies under
+    `minimum_size` pass through untouched. Compressed responses get the
+    weak form of any ETag.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESS_MIN_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if start_message is None:
+                await send(message)
+                return
+            headers = MutableHeaders(scope=start_message)
+            body = message.get("body", b"")
+            if (
+                "content-encoding" not in headers
+                and not message.get("more_body", False)
+                and len(body) >= self.minimum_size
+            ):
+                body = compress(body, encoding, PER_REQUEST_LEVELS)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                if "etag" in headers:
+                    headers["ETag"] = weak_etag(headers["etag"])
+                headers.add_vary_header("Accept-Encoding")
+                message = {**message, "body": body}
+            await send(start_message)
+            start_message = None
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
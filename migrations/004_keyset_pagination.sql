@@ -0,0 +1,11 @@
+-- ============================================
+-- 004: Indexes for keyset (cursor) pagination
+-- Run in Supabase SQL Editor after 003.
+-- Cursor pages read "rows after (sort_key, id)"; an index matching the
+-- listing's ORDER BY turns each page into a short range scan at any depth.
+-- cars/makes/people page by primary key, which is already indexed.
+-- ============================================
+
+-- Data Inbox: WHERE status = ? ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_change_proposals_status_keyset
+  ON public.change_proposals(status, created_at DESC, id DESC);
@@ -0,0 +1,22 @@
+-- ============================================
+-- 005: Precomputed model-page documents
+-- Run in Supabase SQL Editor after 004.
+-- One row per make_model_slug holding the serialized
+-- /cars/model-details response, so a model page is a primary-key read.
+-- The API rebuilds the rows for touched slugs whenever it flushes a car
+-- or make write (services/model_pages.py).
+-- Fill the table only once 006-008 are applied (documents embed
+-- cars.average_rating and the rebuild reads every cars/makes column):
+--   python scripts/backfill_average_rating.py
+--   python scripts/rebuild_model_pages.py
+-- and again after editing cars outside the API. /cars/model-details only
+-- reads this table: a slug without a row is a 404, so do this before
+-- deploying the API. Until the table exists, car and make writes skip
+-- the rebuild and log a warning.
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS public.model_page_documents (
+  make_model_slug TEXT PRIMARY KEY,
+  document TEXT NOT NULL,                  -- JSON body, served as-is
+  updated_at TIMESTAMP NOT NULL DEFAULT now()
+);
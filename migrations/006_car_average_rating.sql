@@ -0,0 +1,15 @@
+-- ============================================
+-- 006: Persisted cars.average_rating
+-- Run in Supabase SQL Editor after 005.
+-- The /10 average of customer_and_critic_rating, kept current by the
+-- API's ORM events on every car write (utils/ratings.calculate_average_rating).
+-- Existing rows start NULL; once 007 and 008 are applied too (the
+-- backfill also rebuilds model pages, which read every column), fill them:
+--   python scripts/backfill_average_rating.py
+-- ============================================
+
+ALTER TABLE public.cars ADD COLUMN IF NOT EXISTS average_rating REAL;
+
+-- Rating-sorted listings: ORDER BY average_rating DESC, id
+CREATE INDEX IF NOT EXISTS idx_cars_average_rating
+  ON public.cars(average_rating DESC NULLS LAST, id);
@@ -0,0 +1,27 @@
+-- ============================================
+-- 007: Persisted makes.slug for /manufacturer/{slug} lookups
+-- Run in Supabase SQL Editor after 006.
+-- Same rule as utils/slugify.make_name_to_slug (and the frontend's
+-- makeNameToSlug): lowercase, whitespace -> '-', drop anything but
+-- [a-z0-9-]. The API sets it on every make insert/update.
+-- ============================================
+
+ALTER TABLE public.makes ADD COLUMN IF NOT EXISTS slug TEXT;
+
+UPDATE public.makes
+SET slug = NULLIF(
+  regexp_replace(regexp_replace(lower(name), '\s+', '-', 'g'), '[^a-z0-9-]', '', 'g'),
+  ''
+)
+WHERE slug IS NULL;
+
+-- Distinct names can share a slug ("Rolls Royce", "Rolls-Royce"): the
+-- lowest id keeps it, the others get "-<id>" so the unique index builds.
+-- The API keeps those slugs until the make is renamed, and answers 409
+-- to any new name whose slug is taken.
+UPDATE public.makes m
+SET slug = m.slug || '-' || m.id
+FROM public.makes other
+WHERE other.slug = m.slug AND other.id < m.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_makes_slug ON public.makes(slug);
@@ -0,0 +1,11 @@
+-- ============================================
+-- 008: people.updated_at
+-- Run in Supabase SQL Editor after 007.
+-- Part of the catalog version (services/catalog.py), so a person edit
+-- reaches every worker's search index and make lineups. The API sets it
+-- on every ORM update of a person. TIMESTAMP (no time zone) like
+-- cars.updated_at and makes.updated_at, which it is compared with.
+-- ============================================
+
+ALTER TABLE public.people
+  ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT now();
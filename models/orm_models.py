@@ -5,6 +5,7 @@ from sqlalchemy import (
     String,
     Float,
     ForeignKey,
+    Index,
     Date,
     Boolean,
     JSON,
@@ -13,10 +14,12 @@ from sqlalchemy import (
     func,
 )
 from sqlalchemy import event, inspect
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from database import Base
+from utils.ratings import calculate_average_rating
 from sqlalchemy.ext.mutable import MutableDict, MutableList
 from services.slug_service import SlugService
+from utils.slugify import make_name_to_slug
 
 # ==== ASSOCIATION TABLES =======
 
@@ -41,11 +44,17 @@ make_ceo_association = Table(
     Base.metadata,
     Column("make_id", Integer, ForeignKey("makes.id")),
     Column("person_id", Integer, ForeignKey("people.id")),
-    # Possibly include additional columns for start and end dates
+    Column("start_date", Date),
+    Column("end_date", Date),
 )
 
 
 class Car(Base):
+    """One trim. Bulky JSON detail columns are deferred in named groups
+    (charging, safety, comfort, media, pricing) so plain Car queries load
+    only the scalar specs; use undefer_group() to fetch them.
+    """
+
     __tablename__ = "cars"
 
     # Basic Information
@@ -80,17 +89,19 @@ class Car(Base):
     availability_desc = Column(
         String, nullable=True, index=True
     )  # eg available, unreleased, discontinued, deprecatedmodel
-    available_countries = Column(
-        MutableDict.as_mutable(JSON), default={}
+    available_countries = deferred(
+        Column(MutableDict.as_mutable(JSON), default={}),
+        group="pricing",
     )  # JSON serialized list of countries
     # ... Add state/province availability if necessary ...
 
     # Charging
     battery_capacity = Column(Float)
     battery_max_charging_speed = Column(Float)  # in kW
-    bidirectional_details = Column(MutableDict.as_mutable(JSON), default={})
-    chargers = Column(
-        MutableList.as_mutable(JSON), default=[]
+    bidirectional_details = deferred(Column(MutableDict.as_mutable(JSON), default={}), group="charging")
+    chargers = deferred(
+        Column(MutableList.as_mutable(JSON), default=[]),
+        group="charging",
     )  # Default to an empty list
     # chargers = relationship(
     #     "Charger", secondary=car_charger_association, back_populates="cars"
@@ -102,13 +113,18 @@ class Car(Base):
     trim_ended = Column(String)
     trim_first_released = Column(String)
 
-    color_options = Column(
-        MutableDict.as_mutable(JSON), default={}
+    color_options = deferred(
+        Column(MutableDict.as_mutable(JSON), default={}),
+        group="media",
     )  # JSON serialized list of available colors
 
     customer_and_critic_rating = Column(MutableDict.as_mutable(JSON), default={})
+    # /10, derived from customer_and_critic_rating by the events below
+    average_rating = Column(Float)
 
-    drive_assist_features = Column(MutableList.as_mutable(JSON), default=[])  # FSD, etc
+    drive_assist_features = deferred(
+        Column(MutableList.as_mutable(JSON), default=[]), group="safety"
+    )  # FSD, etc
     drive_type = Column(String)  # e.g., RWD, AWD
     frunk_capacity = Column(Float)  # in cubic feet
     has_spare_tire = Column(Boolean)
@@ -120,38 +136,53 @@ class Car(Base):
     speed_acc = Column(MutableDict.as_mutable(JSON), default={})  # various acce
 
     # Pricing
-    price_history = Column(
-        MutableDict.as_mutable(JSON), default={}
+    price_history = deferred(
+        Column(MutableDict.as_mutable(JSON), default={}),
+        group="pricing",
     )  # JSON serialized list of price changes with dates
 
-    reviews = Column(MutableList.as_mutable(JSON), default=[])
-    range_details = Column(MutableDict.as_mutable(JSON), default={})
+    reviews = deferred(Column(MutableList.as_mutable(JSON), default=[]), group="media")
+    range_details = deferred(Column(MutableDict.as_mutable(JSON), default={}), group="charging")
 
     # Safety
     euroncap_rating = Column(Float)
     nhtsa_rating = Column(Float)
     sentry_security = Column(Boolean)
-    sentry_details = Column(MutableDict.as_mutable(JSON), default={})
+    sentry_details = deferred(Column(MutableDict.as_mutable(JSON), default={}), group="safety")
 
-    camping_features = Column(MutableDict.as_mutable(JSON), default={})
-    dog_mode = Column(MutableDict.as_mutable(JSON), default={})
-    infotainment_details = Column(MutableDict.as_mutable(JSON), default={})
-    interior_ambient_lighting_details = Column(MutableDict.as_mutable(JSON), default={})
+    camping_features = deferred(Column(MutableDict.as_mutable(JSON), default={}), group="comfort")
+    dog_mode = deferred(Column(MutableDict.as_mutable(JSON), default={}), group="comfort")
+    infotainment_details = deferred(Column(MutableDict.as_mutable(JSON), default={}), group="comfort")
+    interior_ambient_lighting_details = deferred(
+        Column(MutableDict.as_mutable(JSON), default={}), group="comfort"
+    )
     keyless = Column(Boolean)
     number_of_passenger_doors = Column(Integer)
-    remote_heating_cooling = Column(MutableDict.as_mutable(JSON), default={})
-    seating_details = Column(MutableDict.as_mutable(JSON), default={})
-    towing_details = Column(MutableDict.as_mutable(JSON), default={})
-    regen_details = Column(
-        MutableDict.as_mutable(JSON), default={}  # cna you change it,
+    remote_heating_cooling = deferred(Column(MutableDict.as_mutable(JSON), default={}), group="comfort")
+    seating_details = deferred(Column(MutableDict.as_mutable(JSON), default={}), group="comfort")
+    towing_details = deferred(Column(MutableDict.as_mutable(JSON), default={}), group="comfort")
+    regen_details = deferred(
+        Column(MutableDict.as_mutable(JSON), default={}),  # cna you change it,
+        group="charging",
     )
     vehicle_class = Column(String)  # SUV, SEDAN etc.
-    vehicle_sound_details = Column(MutableDict.as_mutable(JSON), default={})
+    vehicle_sound_details = deferred(Column(MutableDict.as_mutable(JSON), default={}), group="comfort")
 
     # Additional media & tracking
-    images = Column(MutableList.as_mutable(JSON), default=[])  # Array of image URLs
+    images = deferred(Column(MutableList.as_mutable(JSON), default=[]), group="media")  # Array of image URLs
     updated_at = Column(DateTime, nullable=True, server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # Rating-sorted listings (migration 006): ORDER BY average_rating DESC, id.
+        # SQLite can't say NULLS LAST in an index but already sorts NULL lowest.
+        Index(
+            "idx_cars_average_rating", average_rating.desc().nulls_last(), id
+        ).ddl_if(dialect="postgresql"),
+        Index("idx_cars_average_rating", average_rating.desc(), id).ddl_if(
+            callable_=lambda ddl, target, bind, dialect, **kw: dialect.name != "postgresql"
+        ),
+    )
+
 
 # Event listener for the Car model before an insert
 @event.listens_for(Car, "before_insert")
@@ -184,6 +215,19 @@ def receive_before_update(mapper, connection, target):
         target.make_model_slug = SlugService.create_slug(make_name, model_name)
 
 
+# Keep average_rating in step with the rating dict (covers PATCH /cars,
+# bulk imports and proposal approvals, which all go through the ORM)
+@event.listens_for(Car, "before_insert")
+def set_average_rating_on_insert(mapper, connection, target):
+    target.average_rating = calculate_average_rating(target.customer_and_critic_rating)
+
+
+@event.listens_for(Car, "before_update")
+def set_average_rating_on_update(mapper, connection, target):
+    if inspect(target).attrs.customer_and_critic_rating.history.has_changes():
+        target.average_rating = calculate_average_rating(target.customer_and_critic_rating)
+
+
 class NewsletterSubscriber(Base):
     """Matches the existing public.newsletter_subscribers table in Supabase."""
 
@@ -196,11 +240,28 @@ class NewsletterSubscriber(Base):
     unsubscribed_at = Column(DateTime(timezone=True), nullable=True)
 
 
+class ModelPageDocument(Base):
+    """Serialized /cars/model-details response per make_model_slug (migration 005).
+
+    Maintained by services/model_pages.py on every car/make flush.
+    """
+
+    __tablename__ = "model_page_documents"
+    __table_args__ = {"extend_existing": True}
+
+    make_model_slug = Column(String, primary_key=True)
+    document = Column(Text, nullable=False)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
 class Make(Base):
     __tablename__ = "makes"
+    # Named as in migration 007 so create_all and migrated schemas agree
+    __table_args__ = (Index("idx_makes_slug", "slug", unique=True),)
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String, unique=True, index=True)
+    slug = Column(String)  # /manufacturer/{slug}, derived from name
 
     # Detailed Information
     founders = relationship(
@@ -247,6 +308,19 @@ class Make(Base):
     cars = relationship("Car", back_populates="make")
 
 
+@event.listens_for(Make, "before_insert")
+def set_make_slug(mapper, connection, target):
+    # Empty names get no slug rather than colliding on ""
+    target.slug = make_name_to_slug(target.name) or None
+
+
+@event.listens_for(Make, "before_update")
+def update_make_slug(mapper, connection, target):
+    # Only on renames: slugs de-duplicated by migration 007 keep their suffix
+    if inspect(target).attrs.name.history.has_changes():
+        set_make_slug(mapper, connection, target)
+
+
 class Person(Base):
     __tablename__ = "people"
 
@@ -261,6 +335,7 @@ class Person(Base):
     weaknesses = Column(MutableDict.as_mutable(JSON), default={})
     current_roles = Column(MutableList.as_mutable(JSON), default=[])
     previous_roles = Column(MutableList.as_mutable(JSON), default=[])
+    updated_at = Column(DateTime, nullable=True, server_default=func.now(), onupdate=func.now())
 
     # Existing relationships
     car_companies_associated = relationship(
@@ -273,3 +348,8 @@ class Person(Base):
     companies_as_ceo = relationship(
         "Make", secondary=make_ceo_association, back_populates="ceos"
     )
+
+
+# Registers the Session after_flush listener that keeps model_page_documents
+# current; imported here so every ORM write (API, scripts, shells) runs it.
+import services.model_pages  # noqa: E402,F401
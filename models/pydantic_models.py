@@ -124,8 +124,19 @@ class MakeCreate(MakeBase):
     pass
 
 
+class MakeImport(MakeBase):
+    """A make in a bulk import, optionally with its leadership."""
+
+    founder_ids: Optional[List[int]] = Field(None)
+    key_personnel_ids: Optional[List[int]] = Field(None)
+    ceo_associations: Optional[List[CEOAssociationCreate]] = Field(
+        None, description="List of CEO associations with tenure dates"
+    )
+
+
 class MakeRead(MakeBase):
     id: int
+    slug: Optional[str] = None
     car_id_list: List[int] = []
 
 
@@ -3,6 +3,7 @@
 from fastapi import APIRouter, Depends
 
 from auth import get_admin_access
+from database import async_engine, async_read_engine, engine, pool_stats
 
 router = APIRouter(tags=["admin"])
 
@@ -10,3 +11,15 @@ router = APIRouter(tags=["admin"])
 @router.get("/admin/verify")
 async def verify_admin_key(admin: dict = Depends(get_admin_access)):
     return {"status": "ok", "message": "Admin key verified"}
+
+
+@router.get("/admin/db-pool")
+async def db_pool_status(admin: dict = Depends(get_admin_access)):
+    """Connection pool occupancy and checkout wait times for this worker."""
+    stats = {
+        "primary": pool_stats(engine),
+        "primary_async": pool_stats(async_engine),
+    }
+    if async_read_engine is not async_engine:
+        stats["replica"] = pool_stats(async_read_engine)
+    return stats
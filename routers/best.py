@@ -0,0 +1,27 @@
+"""Best-of list endpoints (the /best/* SEO pages)."""
+
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from services.best_lists import BEST_LISTS, build_best_lists
+from services.catalog import catalog_dependency
+from utils.http_cache import catalog_validators, not_modified
+
+router = APIRouter(tags=["best"])
+
+CACHE_BEST = "public, s-maxage=600, stale-while-revalidate=3600"
+
+
+@router.get("/best/{list_key}")
+async def read_best_list(
+    list_key: str, catalog: catalog_dependency, request: Request, response: Response
+):
+    if list_key not in BEST_LISTS:
+        raise HTTPException(status_code=404, detail="Unknown list")
+    headers = {
+        "Cache-Control": CACHE_BEST,
+        **catalog_validators(catalog.version, "best", list_key, last_modified=catalog.last_modified),
+    }
+    cached = not_modified(request, headers, response)
+    if cached:
+        return cached
+    return catalog.derive("best_lists", build_best_lists)[list_key]
@@ -1,179 +1,199 @@
 """Car endpoints."""
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Response
+from typing import List, Optional, Tuple
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import joinedload
+from pydantic_core import to_json
+from sqlalchemy import inspect, select
 
 import models.orm_models as models
 from models.pydantic_models import (
     CarBase, CarUpdate, CarCreate, CarRead,
-    ModelDetailResponse, MakeDetails, SubmodelInfo, PreviousGeneration,
+    ModelDetailResponse,
 )
 from auth import get_admin_access
-from dependencies import db_dependency, calculate_average_rating
+from database import AsyncSessionLocal
+from dependencies import db_dependency, read_db_dependency
 from services.car_features import bucket_cars_by_attributes
+from services.car_search import SORT_FIELDS, get_search_index
+from services.car_serialization import (
+    COLUMN_GROUPS, card, car_json, car_list_json, fields_with_groups,
+    groups_for, parse_fields,
+)
+from services.car_details import car_details, evict_car_details
+from services.catalog import CatalogSnapshot, catalog_dependency, invalidate_catalog
+from services.model_pages import read_model_page
+from services.similar import MAX_NEIGHBOURS, get_similar_index
+from utils.http_cache import EncodedBody, catalog_validators, encoded_response, not_modified
+from utils.pagination import check_paging, cursor_id, encode_cursor, next_page_headers
 
 router = APIRouter(tags=["cars"])
 
+# Every column, deferred groups included, for write responses
+CAR_COLUMNS = [column.key for column in inspect(models.Car).column_attrs]
+
 # CDN cache: catalog changes rarely; serve stale while revalidating
 CACHE_LIST = "public, s-maxage=300, stale-while-revalidate=3600"
 CACHE_DETAIL = "public, s-maxage=600, stale-while-revalidate=3600"
 
-# Card-sized projection for the home grid/table — full objects are 60 fields
-# (~288KB for the list); cards need these (~30KB).
-CARD_COLUMNS = (
-    models.Car.id,
-    models.Car.make_id,
-    models.Car.make_name,
-    models.Car.model,
-    models.Car.submodel,
-    models.Car.generation,
-    models.Car.image_url,
-    models.Car.current_price,
-    models.Car.epa_range,
-    models.Car.acceleration_0_60,
-    models.Car.top_speed,
-    models.Car.make_model_slug,
-    models.Car.vehicle_class,
-    models.Car.number_of_full_adult_seats,
-    models.Car.production_availability,
-    models.Car.availability_desc,
-    models.Car.trim_first_released,
-    models.Car.carmodel_first_released,
-    models.Car.customer_and_critic_rating,  # collapsed to average_rating below
-)
+def _with_make_name(snapshot: CatalogSnapshot, car: dict) -> dict:
+    car = dict(car)
+    if not car["make_name"] and car["make_id"] in snapshot.makes:
+        car["make_name"] = snapshot.makes[car["make_id"]]["name"]
+    return car
 
 
-@router.get("/cars/cards")
-async def read_car_cards(db: db_dependency, response: Response):
-    """Slim card list for the home grid: representative models only."""
-    rows = (
-        db.query(*CARD_COLUMNS)
-        .filter(models.Car.is_model_rep == True)  # noqa: E712
-        .all()
-    )
-    result = []
-    for row in rows:
-        d = dict(zip([c.key for c in CARD_COLUMNS], row))
-        d["average_rating"] = calculate_average_rating(
-            d.pop("customer_and_critic_rating")
-        )
-        result.append(d)
-    response.headers["Cache-Control"] = CACHE_LIST
-    return result
+def _build_cards(snapshot: CatalogSnapshot) -> list:
+    return [card(snapshot, car) for car in snapshot.model_reps]
 
 
-@router.get("/cars/model-reps", response_model=List[CarRead])
-async def read_representative_models(db: db_dependency, response: Response):
-    representative_cars = (
-        db.query(models.Car)
-        .options(joinedload(models.Car.make))
-        .filter(models.Car.is_model_rep == True)
-        .all()
-    )
-    for car in representative_cars:
-        car.average_rating = calculate_average_rating(car.customer_and_critic_rating)
-        if car.make and not car.make_name:
-            car.make_name = car.make.name
-    response.headers["Cache-Control"] = CACHE_LIST
-    return representative_cars
+def _build_model_reps(snapshot: CatalogSnapshot) -> list:
+    return [_with_make_name(snapshot, car) for car in snapshot.model_reps]
 
 
-@router.get("/cars/submodels/{make_model_slug}", response_model=List[CarRead])
-async def read_submodels(make_model_slug: str, db: db_dependency):
-    submodels = (
-        db.query(models.Car).filter(models.Car.make_model_slug == make_model_slug).all()
+def _car_list_body(cars: list, fields: Tuple[str, ...]) -> EncodedBody:
+    return EncodedBody(car_list_json(cars, fields))
+
+
+def _car_select(fields: Tuple[str, ...], make_name_from_make: bool = False):
+    """Column-only select of the cars table for fields (see parse_fields)."""
+    columns = [models.Car.__table__.c[name] for name in fields]
+    if not (make_name_from_make and "make_name" in fields):
+        return select(*columns)
+    columns.remove(models.Car.__table__.c.make_name)
+    return select(*columns, models.Make.name.label("make_name")).outerjoin(
+        models.Make, models.Make.id == models.Car.make_id
     )
-    for car in submodels:
-        car.average_rating = calculate_average_rating(car.customer_and_critic_rating)
-    return submodels
 
 
-@router.get("/cars/model-details/{make_model_slug}", response_model=ModelDetailResponse)
-async def read_model_details_and_submodels(
-    make_model_slug: str, db: db_dependency, response: Response
+def _list_headers(catalog: CatalogSnapshot, *parts) -> dict:
+    return {
+        "Cache-Control": CACHE_LIST,
+        **catalog_validators(catalog.version, *parts, last_modified=catalog.last_modified),
+    }
+
+
+@router.get("/cars/cards")
+async def read_car_cards(catalog: catalog_dependency, request: Request, response: Response):
+    """Slim card list for the home grid: representative models only."""
+    cached = not_modified(request, _list_headers(catalog, "cards"), response)
+    if cached:
+        return cached
+    return catalog.derive("cards", _build_cards)
+
+
+SEARCH_SORT_PATTERN = "^-?(" + "|".join(SORT_FIELDS) + ")$"
+
+
+@router.get("/cars/search")
+async def search_cars(
+    catalog: catalog_dependency,
+    request: Request,
+    response: Response,
+    current_price_min: Optional[float] = None,
+    current_price_max: Optional[float] = None,
+    epa_range_min: Optional[float] = None,
+    epa_range_max: Optional[float] = None,
+    acceleration_0_60_min: Optional[float] = None,
+    acceleration_0_60_max: Optional[float] = None,
+    top_speed_min: Optional[float] = None,
+    top_speed_max: Optional[float] = None,
+    battery_capacity_min: Optional[float] = None,
+    battery_capacity_max: Optional[float] = None,
+    vehicle_class: List[str] = Query([]),
+    drive_type: List[str] = Query([]),
+    make_id: List[int] = Query([]),
+    availability_desc: List[str] = Query([]),
+    sort: Optional[str] = Query(None, pattern=SEARCH_SORT_PATTERN),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=0, le=500),
 ):
-    response.headers["Cache-Control"] = CACHE_DETAIL
-    representative_model = (
-        db.query(models.Car)
-        .filter(
-            models.Car.make_model_slug == make_model_slug,
-            models.Car.is_model_rep == True,
-        )
-        .options(joinedload(models.Car.make))
-        .first()
+    """Filter every trim by spec ranges (inclusive) and facet values.
+
+    Repeat a facet parameter to OR values (?vehicle_class=SUV&vehicle_class=Truck).
+    sort takes a spec field, "-" prefixed for descending. Facet counts
+    cover all matches, not just this page.
+    """
+    headers = _list_headers(catalog, "search", request.url.query)
+    cached = not_modified(request, headers, response)
+    if cached:
+        return cached
+
+    positions, facets = get_search_index(catalog).search(
+        ranges={
+            "current_price": (current_price_min, current_price_max),
+            "epa_range": (epa_range_min, epa_range_max),
+            "acceleration_0_60": (acceleration_0_60_min, acceleration_0_60_max),
+            "top_speed": (top_speed_min, top_speed_max),
+            "battery_capacity": (battery_capacity_min, battery_capacity_max),
+        },
+        equals={
+            "vehicle_class": vehicle_class,
+            "drive_type": drive_type,
+            "make_id": make_id,
+            "availability_desc": availability_desc,
+        },
+        sort=sort,
     )
+    return {
+        "total": len(positions),
+        "results": [
+            card(catalog, catalog.cars[position])
+            for position in positions[skip:skip + limit].tolist()
+        ],
+        "facets": facets,
+    }
 
-    if representative_model:
-        representative_model.average_rating = calculate_average_rating(
-            representative_model.customer_and_critic_rating
-        )
-        if representative_model.make and not representative_model.make_name:
-            representative_model.make_name = representative_model.make.name
 
-    if not representative_model:
-        raise HTTPException(status_code=404, detail="Representative model not found")
+@router.get("/cars/model-reps", response_model=List[CarRead])
+async def read_representative_models(
+    catalog: catalog_dependency, request: Request, fields: Optional[str] = None
+):
+    selected = parse_fields(fields)
+    headers = _list_headers(catalog, "model_reps", selected)
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+    body = catalog.derive(
+        ("model_reps_body", selected),
+        lambda snapshot: _car_list_body(_build_model_reps(snapshot), selected),
+    )
+    return encoded_response(request, body, "application/json", headers)
 
-    make_details = None
-    if representative_model.make:
-        make_details = MakeDetails.from_orm(representative_model.make)
 
-    submodels_data = (
-        db.query(
-            models.Car.id,
-            models.Car.submodel,
-            models.Car.image_url,
-            models.Car.current_price,
-            models.Car.acceleration_0_60,
-            models.Car.top_speed,
-            models.Car.epa_range,
-            models.Car.generation,
-            models.Car.availability_desc,
+@router.get("/cars/submodels/{make_model_slug}", response_model=List[CarRead])
+async def read_submodels(
+    make_model_slug: str, db: read_db_dependency, fields: Optional[str] = None
+):
+    selected = parse_fields(fields)
+    rows = (
+        await db.execute(
+            _car_select(selected).where(models.Car.make_model_slug == make_model_slug)
         )
-        .filter(models.Car.make_model_slug == make_model_slug)
-        .all()
+    ).mappings().all()
+    return Response(
+        car_list_json(rows, selected),
+        media_type="application/json",
     )
 
-    current_submodels = []
-    prev_gen_map = {}
-
-    for row in submodels_data:
-        id, submodel, image_url, current_price, acceleration_0_60, top_speed, epa_range, generation, availability_desc = row
-        info = SubmodelInfo(
-            id=id,
-            submodel=submodel,
-            image_url=image_url,
-            current_price=current_price,
-            acceleration_0_60=acceleration_0_60,
-            top_speed=top_speed,
-            epa_range=epa_range,
-            generation=generation,
-            availability_desc=availability_desc,
-        )
-        if availability_desc == "previous_generation":
-            gen_key = generation or "Earlier Generation"
-            if gen_key not in prev_gen_map:
-                prev_gen_map[gen_key] = {"image_url": image_url, "submodels": []}
-            prev_gen_map[gen_key]["submodels"].append(info)
-        else:
-            current_submodels.append(info)
-
-    previous_generations = [
-        PreviousGeneration(
-            generation=gen_key,
-            image_url=data["image_url"],
-            submodels=data["submodels"],
-        )
-        for gen_key, data in prev_gen_map.items()
-    ]
 
-    return {
-        "representative_model": representative_model,
-        "submodels": current_submodels,
-        "make_details": make_details,
-        "previous_generations": previous_generations,
+@router.get("/cars/model-details/{make_model_slug}", response_model=ModelDetailResponse)
+async def read_model_details_and_submodels(
+    make_model_slug: str, db: read_db_dependency, request: Request
+):
+    document, last_modified = await read_model_page(db, make_model_slug)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Representative model not found")
+    headers = {
+        "Cache-Control": CACHE_DETAIL,
+        **catalog_validators(document, "model_details", last_modified=last_modified),
     }
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+    return Response(document, media_type="application/json", headers=headers)
 
 
 @router.get("/cars/admin-list")
@@ -211,52 +231,191 @@ async def read_cars_admin_list(
     ]
 
 
-@router.get("/cars/{car_id}", response_model=CarRead)
-async def read_car_by_id(car_id: int, db: db_dependency):
+MAX_BATCH = 300
+
+
+def _batch_keys(raw: str, cast) -> list:
+    keys = list(dict.fromkeys(part.strip() for part in raw.split(",") if part.strip()))
+    if not keys:
+        raise HTTPException(status_code=400, detail="No ids or slugs given")
+    if len(keys) > MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH} cars per batch")
     try:
-        car = db.query(models.Car).filter(models.Car.id == car_id).first()
-        if car:
-            car_data = car.__dict__
-            car_data["average_rating"] = calculate_average_rating(
-                car.customer_and_critic_rating
-            )
-            car_data["make_name"] = car.make.name if car.make else None
-            return car_data
-        else:
-            return JSONResponse(status_code=404, content={"message": "Car not found"})
-    except Exception as e:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Car not found, are you sure {car_id} the correct car id?",
+        return [cast(key) for key in keys]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be integers")
+
+
+@router.get("/cars/batch")
+async def read_cars_batch(
+    db: read_db_dependency,
+    ids: Optional[str] = Query(None, description="Comma-separated car ids"),
+    slugs: Optional[str] = Query(None, description="Comma-separated full_slugs"),
+    fields: Optional[str] = Query(None, description="Defaults to the card preset"),
+):
+    """Several cars in one query, in request order; unknown keys in "missing"."""
+    if (ids is None) == (slugs is None):
+        raise HTTPException(status_code=400, detail="Pass either ids or slugs")
+    if ids is not None:
+        keys, key_field = _batch_keys(ids, int), "id"
+    else:
+        keys, key_field = _batch_keys(slugs, str), "full_slug"
+    selected = parse_fields(f"{fields or 'card'},{key_field}")
+
+    key_column = models.Car.__table__.c[key_field]
+    rows = (
+        await db.execute(
+            _car_select(selected, make_name_from_make=True).where(key_column.in_(keys))
         )
+    ).mappings().all()
+    found = {row[key_field]: row for row in rows}
+    cars = [found[key] for key in keys if key in found]
+    missing = [key for key in keys if key not in found]
+    body = b'{"cars":' + car_list_json(cars, selected) + b',"missing":' + to_json(missing) + b"}"
+    return Response(body, media_type="application/json")
+
+
+async def _car_detail(
+    db, key_column, key, selected: Tuple[str, ...], car_id: Optional[int] = None
+) -> Optional[dict]:
+    """CarRead row (make name joined in) by id or full_slug, via the detail cache.
+
+    Only the deferred column groups that selected needs are cached or
+    loaded: the core fields plus those groups, merged into whatever the
+    cache already holds for the car. Right after a local write to the car
+    (or its make) the row comes from the primary, so a lagging replica
+    can't put the old one back in the cache.
+    """
+    groups = groups_for(selected)
+    if car_id is not None:
+        car = car_details.get(car_id, groups)
+    else:
+        car = car_details.get_by_slug(key, groups)
+    if car is not None:
+        return car
+    generation = car_details.generation
+    query = _car_select(fields_with_groups(groups), make_name_from_make=True).where(key_column == key)
+    from_primary = car_details.needs_primary(car_id)
+    if from_primary:
+        async with AsyncSessionLocal() as primary:
+            row = (await primary.execute(query)).mappings().first()
+    else:
+        row = (await db.execute(query)).mappings().first()
+    if row is None:
+        return None
+    return car_details.put(dict(row), groups, generation, from_primary)
+
+
+def _car_detail_response(car: Optional[dict], selected: Tuple[str, ...]) -> Response:
+    if car is None:
+        return JSONResponse(status_code=404, content={"message": "Car not found"})
+    return Response(car_json(car, selected), media_type="application/json")
+
+
+EXPAND_DESCRIPTION = (
+    "Deferred detail groups to include on top of the core fields: "
+    + ", ".join(COLUMN_GROUPS) + ", or all. Omit for the full car. Groups left out"
+    " aren't read from the database."
+)
+
+
+@router.get("/cars/by-slug/{full_slug}", response_model=CarRead)
+async def read_car_by_slug(
+    full_slug: str,
+    db: read_db_dependency,
+    fields: Optional[str] = None,
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+):
+    selected = parse_fields(fields, expand)
+    car = await _car_detail(db, models.Car.full_slug, full_slug, selected)
+    return _car_detail_response(car, selected)
+
+
+@router.get("/cars/{car_id}", response_model=CarRead)
+async def read_car_by_id(
+    car_id: int,
+    db: read_db_dependency,
+    fields: Optional[str] = None,
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+):
+    selected = parse_fields(fields, expand)
+    car = await _car_detail(db, models.Car.id, car_id, selected, car_id)
+    return _car_detail_response(car, selected)
+
+
+@router.get("/cars/{car_id}/similar")
+async def read_similar_cars(
+    car_id: int,
+    catalog: catalog_dependency,
+    request: Request,
+    response: Response,
+    k: int = Query(6, ge=1, le=MAX_NEIGHBOURS),
+):
+    """Cards for the k models closest in price, range, performance, size and class."""
+    cached = not_modified(request, _list_headers(catalog, "similar", car_id, k), response)
+    if cached:
+        return cached
+    neighbours = get_similar_index(catalog).neighbours(car_id, k)
+    if neighbours is None:
+        raise HTTPException(status_code=404, detail="Car not found")
+    return {
+        "car_id": car_id,
+        "similar": [
+            {**card(catalog, catalog.cars[position]), "distance": round(distance, 3)}
+            for position, distance in neighbours
+        ],
+    }
 
 
 @router.get("/cars", response_model=List[CarRead])
-async def read_cars(db: db_dependency, skip: int = 0, limit: int = 100):
-    cars = (
-        db.query(models.Car)
-        .options(joinedload(models.Car.make))
-        .offset(skip)
-        .limit(limit)
-        .all()
+async def read_cars(
+    catalog: catalog_dependency,
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=0),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    """Cars in id order. Page with the X-Next-Cursor value (or skip)."""
+    selected = parse_fields(fields)
+    check_paging(skip, cursor)
+    after_id = cursor_id(cursor)
+    start = skip if after_id is None else int(np.searchsorted(catalog.car_ids, after_id, "right"))
+    end = start + limit
+
+    # Served from the snapshot so the cached bytes always match the
+    # version in the ETag (a replica query could lag behind it).
+    headers = catalog_validators(
+        catalog.version, "cars", start, limit, selected, last_modified=catalog.last_modified
     )
-    result = []
-    for car in cars:
-        car_data = car.__dict__
-        car_data["make_name"] = car.make.name
-        car_data["average_rating"] = calculate_average_rating(
-            car.customer_and_critic_rating
-        )
-        result.append(car_data)
-    return result
+    if limit and end < len(catalog.cars):
+        headers.update(next_page_headers(request, encode_cursor(catalog.cars[end - 1]["id"])))
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+
+    def build(snapshot: CatalogSnapshot) -> EncodedBody:
+        page = []
+        for car in snapshot.cars[start:end]:
+            car = dict(car)
+            make = snapshot.makes.get(car["make_id"])
+            if make:
+                car["make_name"] = make["name"]
+            page.append(car)
+        return _car_list_body(page, selected)
+
+    body = catalog.derive(("cars_body", start, limit, selected), build)
+    return encoded_response(request, body, "application/json", headers)
 
 
 @router.get("/car_features")
-async def read_car_features(db: db_dependency, response: Response):
-    response.headers["Cache-Control"] = CACHE_LIST
-    cars = db.query(models.Car).all()
-    car_features = bucket_cars_by_attributes(cars)
-    return car_features
+async def read_car_features(
+    catalog: catalog_dependency, request: Request, response: Response
+):
+    cached = not_modified(request, _list_headers(catalog, "car_features"), response)
+    if cached:
+        return cached
+    return catalog.derive("car_features", bucket_cars_by_attributes)
 
 
 @router.post("/cars", response_model=CarCreate)
@@ -266,7 +425,8 @@ async def create_car(
     db_car = models.Car(**car.model_dump())
     db.add(db_car)
     db.commit()
-    db.refresh(db_car)
+    invalidate_catalog()
+    db.refresh(db_car, CAR_COLUMNS)
     return db_car
 
 
@@ -280,8 +440,9 @@ async def create_bulk_cars(
         db.add(db_car)
         db_cars.append(db_car)
     db.commit()
+    invalidate_catalog()
     for car in db_cars:
-        db.refresh(car)
+        db.refresh(car, CAR_COLUMNS)
     return db_cars
 
 
@@ -302,5 +463,7 @@ async def update_car(
             setattr(db_car, key, value)
 
     db.commit()
-    db.refresh(db_car)
+    invalidate_catalog()
+    evict_car_details(car_id)
+    db.refresh(db_car, CAR_COLUMNS)
     return db_car
@@ -0,0 +1,41 @@
+"""Model comparison endpoint (backs the /compare/{a}-vs-{b} SEO pages)."""
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+from services.catalog import catalog_dependency
+from services.compare import MAX_COMPARE, build_comparison
+from utils.http_cache import catalog_validators, not_modified
+
+router = APIRouter(tags=["compare"])
+
+CACHE_COMPARE = "public, s-maxage=600, stale-while-revalidate=3600"
+
+
+@router.get("/compare")
+async def compare_models(
+    catalog: catalog_dependency,
+    request: Request,
+    response: Response,
+    models: str = Query(..., description="Comma-separated make_model_slugs, 2 to 6"),
+):
+    """Aligned spec matrix for up to six models, with per-row winners."""
+    slugs = tuple(dict.fromkeys(slug.strip() for slug in models.split(",") if slug.strip()))
+    if not 2 <= len(slugs) <= MAX_COMPARE:
+        raise HTTPException(
+            status_code=400, detail=f"Compare between 2 and {MAX_COMPARE} models"
+        )
+
+    headers = {
+        "Cache-Control": CACHE_COMPARE,
+        **catalog_validators(catalog.version, "compare", *slugs, last_modified=catalog.last_modified),
+    }
+    cached = not_modified(request, headers, response)
+    if cached:
+        return cached
+
+    comparison = catalog.derive(
+        ("compare", slugs), lambda snapshot: build_comparison(snapshot, slugs)
+    )
+    if not comparison["models"]:
+        raise HTTPException(status_code=404, detail="None of these models were found")
+    return comparison
@@ -1,51 +1,166 @@
 """Make endpoints."""
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Response
-from sqlalchemy.orm import subqueryload
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 
 import models.orm_models as models
-from models.pydantic_models import MakeBase, MakeCreate, MakeRead, MakeUpdate
+from models.pydantic_models import MakeBase, MakeCreate, MakeImport, MakeRead, MakeUpdate
 from auth import get_admin_access
-from dependencies import db_dependency
+from database import AsyncSessionLocal
+from dependencies import db_dependency, read_db_dependency
+from services.car_details import evict_make_details
+from services.catalog import CatalogSnapshot, catalog_dependency, invalidate_catalog
+from services.leadership import sync_leadership
+from services.lineup import build_lineup, leadership_query
+from utils.http_cache import catalog_validators, not_modified
+from utils.pagination import check_paging, cursor_id, encode_cursor, next_page_headers
+from utils.slugify import make_name_to_slug
 
 router = APIRouter(tags=["makes"])
 
+CACHE_LINEUP = "public, s-maxage=600, stale-while-revalidate=3600"
+
+
+def _car_id_list(dialect_name: str):
+    """car_id_list for the make in the enclosing query, aggregated in the database."""
+    cars = models.Car.__table__
+    if dialect_name == "postgresql":
+        ids = func.array_agg(aggregate_order_by(cars.c.id, cars.c.id))
+    else:
+        ids = func.group_concat(cars.c.id)
+    return (
+        select(ids)
+        .where(cars.c.make_id == models.Make.id)
+        .scalar_subquery()
+        .label("car_id_list")
+    )
+
+
+def _parse_id_list(value) -> List[int]:
+    if not value:
+        return []
+    if isinstance(value, str):  # group_concat
+        return sorted(int(car_id) for car_id in value.split(","))
+    return list(value)
+
+
+def _build_makes_directory(snapshot: CatalogSnapshot) -> List[dict]:
+    """Every make in id order with its car_id_list (MakeRead rows)."""
+    car_ids: Dict[int, List[int]] = {}
+    for car in snapshot.cars:
+        car_ids.setdefault(car["make_id"], []).append(car["id"])
+    return [
+        {**make, "car_id_list": car_ids.get(make_id, [])}
+        for make_id, make in sorted(snapshot.makes.items())
+    ]
+
+
+def _check_slugs_free(db, names: List[Tuple[Optional[int], Optional[str]]]) -> None:
+    """409 unless each (make id or None for a new make, name) gets a slug no
+    other make has. Distinct names can share one ("Rolls Royce", "Rolls-Royce").
+    """
+    wanted: Dict[str, Optional[int]] = {}
+    for make_id, name in names:
+        slug = make_name_to_slug(name)
+        if not slug:
+            continue
+        if slug in wanted:
+            raise HTTPException(
+                status_code=409, detail=f"Two makes in the request share the slug '{slug}'"
+            )
+        wanted[slug] = make_id
+    if not wanted:
+        return
+    taken = db.execute(
+        select(models.Make.slug, models.Make.id).where(models.Make.slug.in_(wanted))
+    ).all()
+    for slug, make_id in taken:
+        if make_id != wanted[slug]:
+            raise HTTPException(
+                status_code=409, detail=f"Make slug '{slug}' is already used by make #{make_id}"
+            )
+
+
+@router.get("/makes/by-slug/{slug}/lineup")
+async def read_make_lineup(
+    slug: str,
+    db: read_db_dependency,
+    catalog: catalog_dependency,
+    request: Request,
+    response: Response,
+):
+    """The make, its leadership and its cards grouped by model and generation."""
+    make = catalog.makes_by_slug.get(slug)
+    if make is None:
+        raise HTTPException(status_code=404, detail="Make not found")
+    headers = {
+        "Cache-Control": CACHE_LINEUP,
+        **catalog_validators(catalog.version, "lineup", slug, last_modified=catalog.last_modified),
+    }
+    cached = not_modified(request, headers, response)
+    if cached:
+        return cached
+
+    async def build(snapshot: CatalogSnapshot) -> dict:
+        # Cached for the whole version: read leadership from where the
+        # snapshot came from, not a replica that may not have the write yet
+        if snapshot.from_primary:
+            async with AsyncSessionLocal() as primary:
+                rows = (await primary.execute(leadership_query(make["id"]))).mappings().all()
+        else:
+            rows = (await db.execute(leadership_query(make["id"]))).mappings().all()
+        return build_lineup(snapshot, make, rows)
+
+    return await catalog.derive_async(("lineup", slug), build)
+
 
 @router.get("/makes/{make_id}", response_model=MakeRead)
-async def read_make(make_id: str, db: db_dependency):
+async def read_make(make_id: int, db: read_db_dependency):
+    makes = models.Make.__table__
+    dialect_name = db.get_bind().dialect.name
     make = (
-        db.query(models.Make)
-        .options(subqueryload(models.Make.cars))
-        .filter(models.Make.id == make_id)
-        .first()
-    )
+        await db.execute(
+            select(makes, _car_id_list(dialect_name)).where(makes.c.id == make_id)
+        )
+    ).mappings().first()
     if not make:
         raise HTTPException(status_code=404, detail="Make not found")
-
-    make_data = make.__dict__
-    make_data["car_id_list"] = [car.id for car in make.cars]
-    return make_data
+    return {**make, "car_id_list": _parse_id_list(make["car_id_list"])}
 
 
 @router.get("/makes", response_model=List[MakeRead])
 async def read_makes(
-    db: db_dependency, response: Response, skip: int = 0, limit: int = 100
+    catalog: catalog_dependency,
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
 ):
-    response.headers["Cache-Control"] = "public, s-maxage=3600, stale-while-revalidate=86400"
-    makes = (
-        db.query(models.Make)
-        .options(subqueryload(models.Make.cars))
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
-    result = []
-    for make in makes:
-        make_data = make.__dict__
-        make_data["car_id_list"] = [car.id for car in make.cars]
-        result.append(make_data)
-    return result
+    """Makes in id order. Page with the X-Next-Cursor value (or skip)."""
+    check_paging(skip, cursor)
+    after_id = cursor_id(cursor)
+    headers = {
+        "Cache-Control": "public, s-maxage=3600, stale-while-revalidate=86400",
+        **catalog_validators(
+            catalog.version, "makes", skip, after_id, limit, last_modified=catalog.last_modified
+        ),
+    }
+    cached = not_modified(request, headers, response)
+    if cached:
+        return cached
+    directory = catalog.derive("makes_directory", _build_makes_directory)
+    if after_id is not None:
+        start = bisect_right([make["id"] for make in directory], after_id)
+    else:
+        start = skip
+    page = directory[start:start + limit]
+    if len(page) == limit:
+        response.headers.update(next_page_headers(request, encode_cursor(page[-1]["id"])))
+    return page
 
 
 @router.post("/makes", response_model=MakeCreate)
@@ -53,23 +168,29 @@ async def create_make(
     make: MakeBase, db: db_dependency, admin: dict = Depends(get_admin_access)
 ):
     make_data = make.model_dump(exclude_unset=True)
+    _check_slugs_free(db, [(None, make.name)])
     db_make = models.Make(**make_data)
     db.add(db_make)
     db.commit()
+    invalidate_catalog()
     db.refresh(db_make)
     return db_make
 
 
 @router.post("/makes/bulk", response_model=List[MakeCreate])
 async def create_bulk_makes(
-    makes: List[MakeBase], db: db_dependency, admin: dict = Depends(get_admin_access)
+    makes: List[MakeImport], db: db_dependency, admin: dict = Depends(get_admin_access)
 ):
+    _check_slugs_free(db, [(None, make.name) for make in makes])
     db_makes = []
     for make in makes:
-        db_make = models.Make(**make.model_dump())
+        db_make = models.Make(**make.model_dump(include=set(MakeBase.model_fields)))
         db.add(db_make)
         db_makes.append(db_make)
+    db.flush()
+    sync_leadership(db, [(db_make.id, make) for db_make, make in zip(db_makes, makes)])
     db.commit()
+    invalidate_catalog()
     for make in db_makes:
         db.refresh(make)
     return db_makes
@@ -86,53 +207,23 @@ async def update_make(
     if not db_make:
         raise HTTPException(status_code=404, detail="Make not found")
 
+    if make_update.name is not None and make_update.name != db_make.name:
+        _check_slugs_free(db, [(make_id, make_update.name)])
+
     update_data = make_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         if value is not None:
             setattr(db_make, key, value)
 
-    # Update founders
-    if make_update.founder_ids is not None:
-        founders = (
-            db.query(models.Person)
-            .filter(models.Person.id.in_(make_update.founder_ids))
-            .all()
-        )
-        if len(founders) != len(make_update.founder_ids):
-            raise HTTPException(
-                status_code=400, detail="One or more founder IDs not found"
-            )
-        db_make.founders = founders
-
-    # Update key personnel
-    if make_update.key_personnel_ids is not None:
-        key_personnel = (
-            db.query(models.Person)
-            .filter(models.Person.id.in_(make_update.key_personnel_ids))
-            .all()
-        )
-        if len(key_personnel) != len(make_update.key_personnel_ids):
-            raise HTTPException(
-                status_code=400, detail="One or more key personnel IDs not found"
-            )
-        db_make.key_personnel = key_personnel
-
-    # Handle CEO updates with start and end dates
-    if make_update.ceo_associations:
-        db.query(models.make_ceo_association).filter_by(make_id=make_id).delete(
-            synchronize_session=False
-        )
-        db.commit()
-
-        for ceo_association in make_update.ceo_associations:
-            new_ceo_assoc = models.make_ceo_association.insert().values(
-                make_id=make_id,
-                person_id=ceo_association.person_id,
-                start_date=ceo_association.start_date,
-                end_date=ceo_association.end_date,
-            )
-            db.execute(new_ceo_assoc)
+    # One diff over founders, key personnel and CEOs, committed together
+    # with the column changes below
+    if make_id in sync_leadership(db, [(make_id, make_update)]):
+        # Association rows don't touch makes.updated_at on their own; bump it
+        # so other workers' catalog version (and cached lineups) move too
+        db_make.updated_at = func.now()
 
     db.commit()
+    invalidate_catalog()
+    evict_make_details(make_id)
     db.refresh(db_make)
     return db_make
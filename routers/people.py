@@ -1,19 +1,39 @@
 """People endpoints."""
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
 
 import models.orm_models as models
 from models.pydantic_models import PersonBase, PersonCreate, PersonRead
 from auth import get_admin_access
-from dependencies import db_dependency
+from dependencies import db_dependency, read_db_dependency
+from services.catalog import invalidate_catalog
+from utils.pagination import after_key, check_paging, cursor_id, encode_cursor, next_page_headers
 
 router = APIRouter(tags=["people"])
 
 
 @router.get("/people", response_model=List[PersonRead])
-async def read_people(db: db_dependency, skip: int = 0, limit: int = 100):
-    people = db.query(models.Person).offset(skip).limit(limit).all()
+async def read_people(
+    db: read_db_dependency,
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    """People in id order. Page with the X-Next-Cursor value (or skip)."""
+    check_paging(skip, cursor)
+    after_id = cursor_id(cursor)
+    query = select(models.Person).order_by(models.Person.id)
+    if after_id is not None:
+        query = query.where(after_key([models.Person.id], [after_id]))
+    else:
+        query = query.offset(skip)
+    people = (await db.scalars(query.limit(limit))).all()
+    if len(people) == limit:
+        response.headers.update(next_page_headers(request, encode_cursor(people[-1].id)))
     return people
 
 
@@ -24,6 +44,7 @@ async def create_person(
     db_person = models.Person(**person.model_dump())
     db.add(db_person)
     db.commit()
+    invalidate_catalog()
     db.refresh(db_person)
     return db_person
 
@@ -38,6 +59,7 @@ async def create_bulk_people(
         db.add(db_person)
         db_people.append(db_person)
     db.commit()
+    invalidate_catalog()
     for person in db_people:
         db.refresh(person)
     return db_people
@@ -59,5 +81,6 @@ async def update_person(
             setattr(db_person, key, value)
 
     db.commit()
+    invalidate_catalog()
     db.refresh(db_person)
     return db_person
@@ -11,7 +11,7 @@ a clear 503 instead of a stack trace.
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.exc import OperationalError, ProgrammingError
 
@@ -19,6 +19,9 @@ import models.orm_models as models
 from models.pipeline_models import ChangeProposal, CrawlRun, VehicleModel
 from auth import get_admin_access
 from dependencies import db_dependency
+from services.car_details import evict_car_details, evict_make_details
+from services.catalog import invalidate_catalog
+from utils.pagination import after_key, decode_cursor, encode_cursor, parse_datetime
 
 router = APIRouter(tags=["proposals"])
 
@@ -185,15 +188,29 @@ async def list_proposals(
     db: db_dependency,
     admin: dict = Depends(get_admin_access),
     status: str = "pending",
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
 ):
-    rows = (
+    query = (
         db.query(ChangeProposal)
         .filter(ChangeProposal.status == status)
-        .order_by(ChangeProposal.created_at.desc())
-        .limit(min(limit, 500))
-        .all()
+        .order_by(ChangeProposal.created_at.desc(), ChangeProposal.id.desc())
     )
+    if cursor:
+        created_at, last_id = decode_cursor(cursor, 2)
+        if not isinstance(last_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(
+            after_key(
+                [ChangeProposal.created_at, ChangeProposal.id],
+                [parse_datetime(created_at), last_id],
+                descending=True,
+            )
+        )
+    rows = query.limit(limit).all()
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
 
     # Enrich with a human label for the inbox UI
     car_ids = [r.entity_id for r in rows if r.entity_type == "car"]
@@ -214,6 +231,7 @@ async def list_proposals(
 
     return {
         "pending_total": pending_total,
+        "next_cursor": next_cursor,
         "proposals": [
             {
                 "id": r.id,
@@ -280,4 +298,10 @@ async def review_proposal(
     prop.status = "approved"
     prop.applied_at = datetime.utcnow()
     db.commit()
+    if prop.entity_type in ("car", "make"):
+        invalidate_catalog()
+    if prop.entity_type == "car":
+        evict_car_details(prop.entity_id)
+    elif prop.entity_type == "make":
+        evict_make_details(prop.entity_id)
     return {"id": prop.id, "status": prop.status, "applied_to": f"{prop.entity_type} #{prop.entity_id}"}
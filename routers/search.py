@@ -0,0 +1,35 @@
+"""Search endpoints."""
+
+from fastapi import APIRouter, Query, Request, Response
+
+from services.catalog import catalog_dependency
+from services.suggest import get_suggest_index
+from utils.http_cache import catalog_validators, not_modified
+
+router = APIRouter(tags=["search"])
+
+CACHE_SUGGEST = "public, s-maxage=300, stale-while-revalidate=3600"
+
+
+@router.get("/search/suggest")
+async def suggest(
+    catalog: catalog_dependency,
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=25),
+):
+    """Ranked make/model/trim/person matches for a search box, typo-tolerant."""
+    headers = {
+        "Cache-Control": CACHE_SUGGEST,
+        **catalog_validators(catalog.version, "suggest", q.lower(), limit),
+    }
+    cached = not_modified(request, headers, response)
+    if cached:
+        return cached
+
+    results = get_suggest_index(catalog).suggest(q, limit)
+    for result in results:
+        if result["type"] == "make":
+            result["slug"] = catalog.makes[result["id"]]["slug"]
+    return {"query": q, "results": results}
@@ -1,20 +1,19 @@
 """SEO endpoints.
 
-/sitemap.xml is generated from the DB and proxied through the frontend domain
-(www.evlineup.org/sitemap.xml -> this endpoint) via a Vercel rewrite, so it
-always reflects the live catalog without a rebuild.
+/sitemap.xml is generated from the catalog snapshot and proxied through the
+frontend domain (www.evlineup.org/sitemap.xml -> this endpoint) via a Vercel
+rewrite, so it always reflects the live catalog without a rebuild.
 """
 
-import re
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter
-from fastapi.responses import Response
-from sqlalchemy import func
+from fastapi import APIRouter, Request
 
-import models.orm_models as models
-from dependencies import db_dependency
+from services.best_lists import BEST_LISTS
+from services.catalog import CatalogSnapshot, catalog_dependency
+from utils.http_cache import EncodedBody, catalog_validators, encoded_response, not_modified
+from utils.slugify import make_name_to_slug
 
 router = APIRouter(tags=["seo"])
 
@@ -24,14 +23,9 @@ STATIC_PATHS = ["/", "/about", "/people", "/marketplace", "/advertise", "/privac
 
 # Programmatic SEO pages — long-tail comparison + best-of queries are the
 # traffic engine for spec-database sites. Keep in sync with the frontend's
-# src/data/seoPages.ts and api/prerender.js.
-BEST_PATHS = [
-    "/best/evs-under-40k",
-    "/best/longest-range-evs",
-    "/best/fastest-evs",
-    "/best/cheapest-evs",
-    "/best/3-row-evs",
-]
+# src/data/seoPages.ts and api/prerender.js. Best-of lists are configured
+# in services/best_lists.py.
+BEST_PATHS = [f"/best/{key}" for key in BEST_LISTS]
 
 COMPARE_PAIRS = [
     "tesla-model-3-vs-bmw-i4",
@@ -47,13 +41,6 @@ COMPARE_PAIRS = [
 ]
 
 
-def make_name_to_slug(name: str) -> str:
-    """Mirror of frontend makeNameToSlug (src/utils/makeSlug.ts):
-    lowercase, whitespace -> '-', strip everything but [a-z0-9-]."""
-    slug = re.sub(r"\s+", "-", (name or "").lower())
-    return re.sub(r"[^a-z0-9-]", "", slug)
-
-
 def _lastmod(dt: Optional[datetime]) -> str:
     return (dt or datetime.utcnow()).strftime("%Y-%m-%d")
 
@@ -69,8 +56,28 @@ def _url(loc: str, lastmod: str, priority: str) -> str:
 
 
 @router.get("/sitemap.xml")
-async def sitemap(db: db_dependency):
+async def sitemap(catalog: catalog_dependency, request: Request):
     today = datetime.utcnow().strftime("%Y-%m-%d")
+    headers = {
+        # CDN-cache for an hour; serve stale while refreshing
+        "Cache-Control": "public, s-maxage=3600, stale-while-revalidate=86400",
+        # Static entries carry today's date, so the tag rolls over daily too
+        **catalog_validators(
+            catalog.version, "sitemap", today, last_modified=catalog.last_modified
+        ),
+    }
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+
+    body = catalog.derive(
+        ("sitemap", today),
+        lambda snapshot: EncodedBody(_build_sitemap(snapshot, today).encode()),
+    )
+    return encoded_response(request, body, "application/xml", headers)
+
+
+def _build_sitemap(catalog: CatalogSnapshot, today: str) -> str:
     parts = [
         '<?xml version="1.0" encoding="UTF-8"?>\n',
         '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n',
@@ -87,35 +94,24 @@ async def sitemap(db: db_dependency):
         parts.append(_url(f"{CANONICAL_HOST}/compare/{pair}", today, "0.8"))
 
     # Model pages — only slugs with a representative car (others 404)
-    model_rows = (
-        db.query(models.Car.make_model_slug, func.max(models.Car.updated_at))
-        .filter(models.Car.is_model_rep == True)  # noqa: E712
-        .group_by(models.Car.make_model_slug)
-        .all()
-    )
-    for slug, updated in sorted(model_rows):
-        if not slug:
-            continue
+    model_updates = {}
+    for car in catalog.model_reps:
+        if car["make_model_slug"]:
+            model_updates.setdefault(car["make_model_slug"], []).append(car["updated_at"])
+    for slug in sorted(model_updates):
+        updated = max(filter(None, model_updates[slug]), default=None)
         parts.append(
             _url(f"{CANONICAL_HOST}/model_detail/{slug}", _lastmod(updated), "0.8")
         )
 
     # Manufacturer pages
-    make_rows = db.query(models.Make.name, models.Make.updated_at).all()
-    for name, updated in sorted(make_rows):
-        slug = make_name_to_slug(name)
+    for make in sorted(catalog.makes.values(), key=lambda make: make["name"] or ""):
+        slug = make["slug"] or make_name_to_slug(make["name"])
         if not slug:
             continue
         parts.append(
-            _url(f"{CANONICAL_HOST}/manufacturer/{slug}", _lastmod(updated), "0.7")
+            _url(f"{CANONICAL_HOST}/manufacturer/{slug}", _lastmod(make["updated_at"]), "0.7")
         )
 
     parts.append("</urlset>\n")
-    return Response(
-        content="".join(parts),
-        media_type="application/xml",
-        headers={
-            # CDN-cache for an hour; serve stale while refreshing
-            "Cache-Control": "public, s-maxage=3600, stale-while-revalidate=86400",
-        },
-    )
+    return "".join(parts)
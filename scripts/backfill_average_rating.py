@@ -0,0 +1,92 @@
+"""Backfill cars.average_rating (migration 006) from customer_and_critic_rating.
+
+The API keeps the column current on every car write; this fills rows
+written before the column existed (or edited outside the API). Scores are
+normalized in one NumPy pass over a cars x sources matrix, following
+utils.ratings.calculate_average_rating: <= 0 dropped, <= 5 treated as /5
+and doubled, capped at 10, averaged, rounded to one decimal. Only rows
+whose stored value differs are updated.
+
+Updated rows get a new updated_at, which moves the catalog version so
+running workers reload their snapshot (and ETags) with the ratings. The
+model-page documents of the touched slugs are rebuilt in the same
+transaction, since Core updates don't run the ORM's after_flush rebuild.
+Run it after migrations 006-008.
+
+Usage:
+  python scripts/backfill_average_rating.py [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+from sqlalchemy import bindparam, select, update  # noqa: E402
+
+import models.orm_models as models  # noqa: E402
+from database import engine  # noqa: E402
+from services.model_pages import rebuild_model_pages  # noqa: E402
+from utils.ratings import calculate_average_rating  # noqa: E402
+
+cars = models.Car.__table__
+
+
+def average_ratings(ratings: List[Optional[dict]]) -> List[Optional[float]]:
+    """calculate_average_rating over many rating dicts at once."""
+    width = max((len(r) for r in ratings if r), default=0)
+    scores = np.full((len(ratings), max(width, 1)), np.nan)
+    for row, rating in enumerate(ratings):
+        if rating:
+            values = [np.nan if value is None else value for value in rating.values()]
+            scores[row, :len(values)] = values
+    with np.errstate(invalid="ignore"):
+        scores = np.where(scores > 0, scores, np.nan)
+        scores = np.minimum(np.where(scores <= 5, scores * 2, scores), 10.0)
+    counts = (~np.isnan(scores)).sum(axis=1)
+    means = np.nansum(scores, axis=1) / np.maximum(counts, 1)
+    averages = [round(float(mean), 1) if count else None for mean, count in zip(means, counts)]
+    # Summation order can differ from sum() in the last bit, which matters
+    # only when the mean sits on a rounding boundary (x.x5); let the
+    # scalar version decide those so stored values match the write path.
+    tenths = means * 10
+    for row in np.flatnonzero(np.abs(tenths - np.floor(tenths) - 0.5) < 1e-6):
+        averages[row] = calculate_average_rating(ratings[row])
+    return averages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        rows = conn.execute(
+            select(
+                cars.c.id, cars.c.make_model_slug,
+                cars.c.customer_and_critic_rating, cars.c.average_rating,
+            )
+        ).all()
+        averages = average_ratings([row.customer_and_critic_rating for row in rows])
+        changed = [
+            (row, average) for row, average in zip(rows, averages) if row.average_rating != average
+        ]
+        if changed and not args.dry_run:
+            # updated_at takes its onupdate (now()): the catalog version has to move
+            conn.execute(
+                update(cars).where(cars.c.id == bindparam("car_id"))
+                .values(average_rating=bindparam("rating")),
+                [{"car_id": row.id, "rating": average} for row, average in changed],
+            )
+            rebuild_model_pages(
+                conn, sorted({row.make_model_slug for row, _ in changed if row.make_model_slug})
+            )
+    print(f"{len(changed)} of {len(rows)} cars {'would change' if args.dry_run else 'updated'}")
+
+
+if __name__ == "__main__":
+    main()
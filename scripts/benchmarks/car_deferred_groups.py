@@ -0,0 +1,98 @@
+"""Benchmark: ORM Car loads with and without the deferred JSON groups.
+
+Fills a scratch SQLite database with N cars built from
+dummy_data/dummy_cars.json and times session.query(Car).all():
+- "all columns": undefer("*"), i.e. what every Car query loaded before the
+  JSON detail columns were grouped and deferred;
+- "deferred": the default load, scalar columns only.
+
+Reports the best time and the peak Python memory (tracemalloc) per 1k
+cars. Pass --url to run against Postgres instead; it drops and recreates
+the cars table there, so only point it at a scratch database.
+
+Usage:
+  python scripts/benchmarks/car_deferred_groups.py [--rows 10000] [--repeat 5] [--url URL]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import Session, undefer  # noqa: E402
+
+import models.orm_models as models  # noqa: E402
+from models.pydantic_models import CarBase  # noqa: E402
+
+cars = models.Car.__table__
+
+
+def fill(engine, rows: int) -> None:
+    with open(os.path.join(ROOT, "dummy_data", "dummy_cars.json")) as f:
+        templates = [CarBase(**car).model_dump() for car in json.load(f)]
+    cars.drop(engine, checkfirst=True)
+    cars.create(engine)
+    batch = 2000
+    with engine.begin() as conn:
+        for start in range(0, rows, batch):
+            chunk = []
+            for i in range(start, min(start + batch, rows)):
+                car = {k: v for k, v in templates[i % len(templates)].items() if k in cars.c}
+                car.update(id=i + 1, full_slug=f"car-{i + 1}")
+                chunk.append(car)
+            conn.execute(insert(cars), chunk)
+
+
+def load(engine, options) -> list:
+    with Session(engine) as session:
+        return session.query(models.Car).options(*options).all()
+
+
+def measure(engine, options, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load(engine, options)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    loaded = load(engine, options)  # noqa: F841 - keep alive for the peak
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--url", help="database URL (default: scratch SQLite file)")
+    args = parser.parse_args()
+
+    scratch = None
+    if not args.url:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        args.url = f"sqlite:///{scratch.name}"
+    engine = create_engine(args.url)
+    try:
+        fill(engine, args.rows)
+        per_k = 1000 / args.rows
+        print(f"{'load':>12}  {'ms/1k cars':>10}  {'KB/1k cars':>10}")
+        for label, options in (("all columns", [undefer("*")]), ("deferred", [])):
+            seconds, peak = measure(engine, options, args.repeat)
+            print(f"{label:>12}  {seconds * 1000 * per_k:>10.1f}  {peak / 1024 * per_k:>10.0f}")
+    finally:
+        cars.drop(engine, checkfirst=True)
+        engine.dispose()
+        if scratch:
+            os.unlink(scratch.name)
+
+
+if __name__ == "__main__":
+    main()
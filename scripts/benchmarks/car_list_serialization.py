@@ -0,0 +1,93 @@
+"""Benchmark: car list JSON via response_model validation vs the fast path.
+
+Compares, for a catalog of N cars built from dummy_data/dummy_cars.json:
+- "response_model": what FastAPI does for response_model=List[CarRead]
+  (validate every row, dump to JSON-able python, json.dumps);
+- "fast path": services.car_serialization.car_list_json.
+
+Both outputs are parsed and compared before timing, so a drift in the fast
+path's shape fails loudly instead of producing a flattering number.
+
+Usage:
+  python scripts/benchmarks/car_list_serialization.py [--sizes 1000 10000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from utils.ratings import calculate_average_rating  # noqa: E402
+from models.pydantic_models import CarBase, CarRead  # noqa: E402
+from services.car_serialization import car_list_json  # noqa: E402
+
+CAR_LIST_ADAPTER = TypeAdapter(List[CarRead])
+
+
+def make_rows(n: int) -> List[dict]:
+    """N snapshot-style rows (what CatalogCache._load produces)."""
+    with open(os.path.join(ROOT, "dummy_data", "dummy_cars.json")) as f:
+        templates = json.load(f)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = []
+    for i in range(n):
+        # Same column set the cars table stores (POST /cars writes model_dump())
+        car = CarBase(**templates[i % len(templates)]).model_dump()
+        car.update(
+            id=i + 1,
+            make_id=car.get("make_id") or 1,
+            make_name=car.get("make_name") or "Make",
+            created_at=now,
+            updated_at=now,
+        )
+        if not car.get("customer_and_critic_rating"):
+            car["customer_and_critic_rating"] = {"Edmunds": 8.0}
+        car["average_rating"] = calculate_average_rating(car["customer_and_critic_rating"])
+        rows.append(car)
+    return rows
+
+
+def response_model_path(rows: List[dict]) -> bytes:
+    validated = CAR_LIST_ADAPTER.validate_python(rows)
+    return json.dumps(CAR_LIST_ADAPTER.dump_python(validated, mode="json")).encode()
+
+
+def best_of(fn, rows, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'cars':>7}  {'response_model':>15}  {'fast path':>10}  {'speedup':>7}  {'size':>9}")
+    for n in args.sizes:
+        rows = make_rows(n)
+        slow_body, fast_body = response_model_path(rows), car_list_json(rows)
+        if json.loads(slow_body) != json.loads(fast_body):
+            sys.exit(f"outputs differ at {n} cars")
+        slow = best_of(response_model_path, rows, args.repeat)
+        fast = best_of(car_list_json, rows, args.repeat)
+        print(
+            f"{n:>7}  {slow * 1000:>13.1f}ms  {fast * 1000:>8.1f}ms  "
+            f"{slow / fast:>6.1f}x  {len(fast_body) / 1024:>7.0f}KB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark: offset vs keyset (cursor) page cost by depth.
+
+Fills a scratch SQLite database with N people and times fetching one page
+at increasing depths with the two queries GET /people runs:
+- offset: ORDER BY id OFFSET depth LIMIT page
+- keyset: WHERE id > <last id of previous page> ORDER BY id LIMIT page
+
+Offset cost grows with depth (the skipped rows are still read); keyset
+cost stays flat. Pass --url to run against Postgres instead; it drops and
+recreates the people table there, so only point it at a scratch database.
+
+Usage:
+  python scripts/benchmarks/keyset_pagination.py [--rows 200000] [--page 100] [--url URL]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+
+import models.orm_models as models  # noqa: E402
+from utils.pagination import after_key  # noqa: E402
+
+people = models.Person.__table__
+
+
+def fill(engine, rows: int) -> None:
+    people.drop(engine, checkfirst=True)
+    people.create(engine)
+    batch = 10000
+    with engine.begin() as conn:
+        for start in range(0, rows, batch):
+            conn.execute(insert(people), [
+                {"id": i + 1, "name": f"Person {i + 1}", "skills": [], "current_roles": []}
+                for i in range(start, min(start + batch, rows))
+            ])
+
+
+def best_of(engine, query, repeat: int) -> float:
+    best = float("inf")
+    with engine.connect() as conn:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(query).all()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--url", help="database URL (default: scratch SQLite file)")
+    args = parser.parse_args()
+
+    scratch = None
+    if not args.url:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        args.url = f"sqlite:///{scratch.name}"
+    engine = create_engine(args.url)
+    try:
+        fill(engine, args.rows)
+        ordered = select(people).order_by(people.c.id)
+        print(f"{'depth':>8}  {'offset':>9}  {'keyset':>9}")
+        depths = [0]
+        while depths[-1] * 4 < args.rows:
+            depths.append(depths[-1] * 4 or args.page * 10)
+        depths.append(args.rows - args.page)
+        for depth in depths:
+            # ids are 1..N, so the row before `depth` has id == depth
+            offset = best_of(engine, ordered.offset(depth).limit(args.page), args.repeat)
+            keyset = best_of(
+                engine, ordered.where(after_key([people.c.id], [depth])).limit(args.page), args.repeat
+            )
+            print(f"{depth:>8}  {offset * 1000:>7.2f}ms  {keyset * 1000:>7.2f}ms")
+    finally:
+        people.drop(engine, checkfirst=True)
+        engine.dispose()
+        if scratch:
+            os.unlink(scratch.name)
+
+
+if __name__ == "__main__":
+    main()
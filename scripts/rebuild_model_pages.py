@@ -0,0 +1,36 @@
+"""Rebuild model_page_documents (migration 005) from the cars and makes tables.
+
+The API keeps the documents current for writes it makes itself; run this
+once migrations 005-008 and scripts/backfill_average_rating.py have run
+(it reads every cars and makes column), and after any change made outside
+the API (SQL editor, imports).
+
+Usage:
+  python scripts/rebuild_model_pages.py [slug ...]
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import delete  # noqa: E402
+
+from database import engine  # noqa: E402
+from services.model_pages import all_model_slugs, documents_table, rebuild_model_pages  # noqa: E402
+
+
+def main():
+    slugs = sys.argv[1:]
+    with engine.begin() as conn:
+        if not slugs:
+            slugs = all_model_slugs(conn)
+            # Full rebuild: drop documents for slugs that no longer exist
+            conn.execute(delete(documents_table))
+        rebuild_model_pages(conn, slugs)
+    print(f"rebuilt {len(slugs)} model pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Declarative "best of" rankings (/best/{list_key}).
+
+A list is a BestList entry: filters every candidate must pass, a sort
+field and direction, and how many cars to keep. Candidates are current
+trims (previous generations are skipped), at most one per model: the
+trim that ranks best for that list. Top-K selection uses a heap, and all
+lists are materialized together once per catalog version.
+
+Adding a list is adding a BEST_LISTS entry; /best/{key} and the sitemap
+pick it up. Keep keys in sync with the frontend's src/data/seoPages.ts.
+"""
+
+import heapq
+import operator
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from services.car_serialization import card
+from services.catalog import CatalogSnapshot
+
+OPERATORS: Dict[str, Callable] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+}
+
+
+class BestList(NamedTuple):
+    title: str
+    filters: Tuple[Tuple[str, str, object], ...]  # (field, operator, value)
+    sort_field: str
+    descending: bool
+    k: int = 10
+
+
+BEST_LISTS: Dict[str, BestList] = {
+    "evs-under-40k": BestList(
+        "Best EVs under $40k", (("current_price", "<", 40000),), "average_rating", True
+    ),
+    "longest-range-evs": BestList("Longest range EVs", (), "epa_range", True),
+    "fastest-evs": BestList("Fastest EVs (0-60 mph)", (), "acceleration_0_60", False),
+    "cheapest-evs": BestList("Cheapest EVs", (), "current_price", False),
+    "3-row-evs": BestList(
+        "Best 3-row EVs", (("number_of_full_adult_seats", ">=", 6),), "average_rating", True
+    ),
+}
+
+
+def _passes(car: dict, best_list: BestList) -> bool:
+    if car[best_list.sort_field] is None:
+        return False
+    for field, op, value in best_list.filters:
+        if car[field] is None or not OPERATORS[op](car[field], value):
+            return False
+    return True
+
+
+def rank(snapshot: CatalogSnapshot, best_list: BestList) -> List[dict]:
+    sign = -1 if best_list.descending else 1
+
+    def sort_key(car: dict):
+        # Ties go to the lower id so the order is stable across rebuilds
+        return (sign * car[best_list.sort_field], car["id"])
+
+    best_per_model: Dict[str, dict] = {}
+    for car in snapshot.cars:
+        if car["availability_desc"] == "previous_generation" or not _passes(car, best_list):
+            continue
+        model = car["make_model_slug"] or car["id"]
+        current = best_per_model.get(model)
+        if current is None or sort_key(car) < sort_key(current):
+            best_per_model[model] = car
+
+    top = heapq.nsmallest(best_list.k, best_per_model.values(), key=sort_key)
+    return [{"rank": position, **card(snapshot, car)} for position, car in enumerate(top, 1)]
+
+
+def build_best_lists(snapshot: CatalogSnapshot) -> Dict[str, dict]:
+    return {
+        key: {"key": key, "title": best_list.title, "cars": rank(snapshot, best_list)}
+        for key, best_list in BEST_LISTS.items()
+    }
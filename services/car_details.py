@@ -0,0 +1,134 @@
+"""Per-worker cache of car detail rows (/cars/{car_id}, /cars/by-slug/{slug}).
+
+Detail pages are hit far more often than cars are edited, and the
+catalog snapshot is too coarse for them: any write anywhere would throw
+every detail away. Entries here are CarRead rows (make name joined in)
+reachable by id and by full_slug, so both routes share one entry per car.
+
+An entry holds the core fields plus the deferred column groups
+(services.car_serialization.COLUMN_GROUPS) loaded for it so far. A miss
+loads only the groups its request needs (?fields=, ?expand=), and later
+loads of other groups merge into the entry. A request for the full car
+still loads and caches every group.
+
+- Write endpoints call evict_car_details(car_id) after commit; make
+  writes call evict_make_details(make_id) since the make name is part of
+  the row. Other workers see the change after at most
+  CAR_DETAIL_TTL_SECONDS.
+- Only hits are cached; unknown ids/slugs come from the URL and would
+  otherwise fill the cache with junk.
+- A load that started before an eviction isn't stored (generation check),
+  so a slow read can't put back the row a write just replaced.
+- Evicted rows are reloaded from the primary (needs_primary()) until a
+  primary read of them is stored, or for at most CAR_DETAIL_TTL_SECONDS:
+  the replica may not have the write yet, and the stale row would
+  otherwise be cached again, as CatalogCache avoids after a local write.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+CAR_DETAIL_CACHE_SIZE = int(os.getenv("CAR_DETAIL_CACHE_SIZE", "2048"))
+CAR_DETAIL_TTL_SECONDS = float(os.getenv("CAR_DETAIL_TTL_SECONDS", "60"))
+
+
+class CarDetailCache:
+    def __init__(self, size: int = CAR_DETAIL_CACHE_SIZE, ttl: float = CAR_DETAIL_TTL_SECONDS):
+        self.size = size
+        self.ttl = ttl
+        self.generation = 0
+        # car id -> (stored at, row, deferred groups present in row)
+        self._rows: "OrderedDict[int, Tuple[float, dict, FrozenSet[str]]]" = OrderedDict()
+        self._ids_by_slug: Dict[str, int] = {}
+        # Evicted since: car id / make id -> time.monotonic()
+        self._pending: Dict[int, float] = {}
+        self._pending_makes: Dict[int, float] = {}
+
+    def get(self, car_id: int, groups: Iterable[str] = ()) -> Optional[dict]:
+        """The cached row for car_id if it holds every one of groups."""
+        entry = self._live(car_id)
+        if entry is None or not entry[2].issuperset(groups):
+            return None
+        self._rows.move_to_end(car_id)
+        return entry[1]
+
+    def get_by_slug(self, full_slug: str, groups: Iterable[str] = ()) -> Optional[dict]:
+        car_id = self._ids_by_slug.get(full_slug)
+        return None if car_id is None else self.get(car_id, groups)
+
+    def _live(self, car_id: int):
+        entry = self._rows.get(car_id)
+        if entry is not None and time.monotonic() - entry[0] > self.ttl:
+            self._remove(car_id)
+            return None
+        return entry
+
+    def needs_primary(self, car_id: Optional[int] = None) -> bool:
+        """Whether a load (of car_id, or of an unknown car) must skip the replica."""
+        now = time.monotonic()
+        for pending in (self._pending, self._pending_makes):
+            for key in [key for key, evicted_at in pending.items() if now - evicted_at > self.ttl]:
+                del pending[key]
+        if self._pending_makes:
+            return True
+        return bool(self._pending) if car_id is None else car_id in self._pending
+
+    def put(
+        self, row: dict, groups: Iterable[str], generation: int, from_primary: bool = False
+    ) -> dict:
+        """Store row (core fields + groups) unless something was evicted since
+        generation was read; return the row as cached, merged with the groups
+        already held for the car.
+
+        Rows of recently evicted cars are only stored when read from the
+        primary.
+        """
+        if generation != self.generation:
+            return row
+        if from_primary:
+            self._pending.pop(row["id"], None)
+        elif row["id"] in self._pending or row["make_id"] in self._pending_makes:
+            return row
+        stored_at, groups = time.monotonic(), frozenset(groups)
+        entry = self._live(row["id"])
+        if entry is not None:
+            # Keep the older timestamp: the merged groups are only as fresh as it
+            stored_at, row, groups = entry[0], {**entry[1], **row}, entry[2] | groups
+        self._remove(row["id"])
+        self._rows[row["id"]] = (stored_at, row, groups)
+        if row.get("full_slug"):
+            self._ids_by_slug[row["full_slug"]] = row["id"]
+        while len(self._rows) > self.size:
+            self._remove(next(iter(self._rows)))
+        return row
+
+    def evict(self, car_id: int) -> None:
+        self.generation += 1
+        self._pending[car_id] = time.monotonic()
+        self._remove(car_id)
+
+    def evict_make(self, make_id: int) -> None:
+        self.generation += 1
+        self._pending_makes[make_id] = time.monotonic()
+        for car_id in [car_id for car_id, (_, row, _) in self._rows.items() if row["make_id"] == make_id]:
+            self._remove(car_id)
+
+    def _remove(self, car_id: int) -> None:
+        entry = self._rows.pop(car_id, None)
+        if entry is not None:
+            full_slug = entry[1].get("full_slug")
+            if self._ids_by_slug.get(full_slug) == car_id:
+                del self._ids_by_slug[full_slug]
+
+
+car_details = CarDetailCache()
+
+
+def evict_car_details(car_id: int) -> None:
+    car_details.evict(car_id)
+
+
+def evict_make_details(make_id: int) -> None:
+    car_details.evict_make(make_id)
@@ -1,125 +1,84 @@
-from typing import Dict, List
-from models.pydantic_models import CarRead
-
-
-def get_car_prices(cars: List[CarRead]) -> Dict[str, List[int]]:
-    price_buckets = {
-        "under_20k": [],
-        "20_30k": [],
-        "30_40k": [],
-        "40_50k": [],
-        "50_60k": [],
-        "60_80k": [],
-        "80_100k": [],
-        "100_130k": [],
-        "130_180k": [],
-        "180_220k": [],
-        "over_220k": [],
-    }
-
-    for car in cars:
-        if car.current_price is None:
-            continue
-
-        if car.current_price < 20000:
-            price_buckets["under_20k"].append(car.id)
-        elif 20000 <= car.current_price < 30000:
-            price_buckets["20_30k"].append(car.id)
-        elif 30000 <= car.current_price < 40000:
-            price_buckets["30_40k"].append(car.id)
-        elif 40000 <= car.current_price < 50000:
-            price_buckets["40_50k"].append(car.id)
-        elif 50000 <= car.current_price < 60000:
-            price_buckets["50_60k"].append(car.id)
-        elif 60000 <= car.current_price < 80000:
-            price_buckets["60_80k"].append(car.id)
-        elif 80000 <= car.current_price < 100000:
-            price_buckets["80_100k"].append(car.id)
-        elif 100000 <= car.current_price < 130000:
-            price_buckets["100_130k"].append(car.id)
-        elif 130000 <= car.current_price < 180000:
-            price_buckets["130_180k"].append(car.id)
-        elif 180000 <= car.current_price < 220000:
-            price_buckets["180_220k"].append(car.id)
-
-        # Over 220k
-        elif car.current_price > 220000:
-            price_buckets["over_220k"].append(car.id)
-
-    return price_buckets
-
-
-def get_acceleration(cars: List[CarRead]) -> Dict[str, List[int]]:
-    acceleration_buckets = {
-        "under_2s": [],
-        "2_3s": [],
-        "3_4s": [],
-        "4_5s": [],
-        "6_8s": [],
-        "8_10s": [],
-        "over_10s": [],
-    }
-
-    for car in cars:
-        if car.acceleration_0_60 is None:
-            continue
-
-        if car.acceleration_0_60 < 2:
-            acceleration_buckets["under_2s"].append(car.id)
-        elif 2 <= car.acceleration_0_60 < 3:
-            acceleration_buckets["2_3s"].append(car.id)
-        elif 3 <= car.acceleration_0_60 < 4:
-            acceleration_buckets["3_4s"].append(car.id)
-        elif 4 <= car.acceleration_0_60 < 5:
-            acceleration_buckets["4_5s"].append(car.id)
-        elif 6 <= car.acceleration_0_60 < 8:
-            acceleration_buckets["6_8s"].append(car.id)
-        elif 8 <= car.acceleration_0_60 < 10:
-            acceleration_buckets["8_10s"].append(car.id)
-        elif car.acceleration_0_60 >= 10:
-            acceleration_buckets["over_10s"].append(car.id)
-
-    return acceleration_buckets
-
-
-def get_top_speed(cars: List[CarRead]) -> Dict[str, List[int]]:
-    top_speed_buckets = {
-        "under_100": [],
-        "100_120": [],
-        "120_150": [],
-        "150_180": [],
-        "180_200": [],
-        "over_200": [],
-    }
-
-    for car in cars:
-        if car.top_speed is None:
-            continue
-
-        if car.top_speed < 100:
-            top_speed_buckets["under_100"].append(car.id)
-        elif 100 <= car.top_speed < 120:
-            top_speed_buckets["100_120"].append(car.id)
-        elif 120 <= car.top_speed < 150:
-            top_speed_buckets["120_150"].append(car.id)
-        elif 150 <= car.top_speed < 180:
-            top_speed_buckets["150_180"].append(car.id)
-        elif 180 <= car.top_speed < 200:
-            top_speed_buckets["180_200"].append(car.id)
-        elif car.top_speed >= 200:
-            top_speed_buckets["over_200"].append(car.id)
-
-    return top_speed_buckets
-
-
-def bucket_cars_by_attributes(cars: List[CarRead]) -> Dict[str, Dict[str, List[int]]]:
-    price_buckets = get_car_prices(cars)
-    acceleration_buckets = get_acceleration(cars)
-    top_speed_buckets = get_top_speed(cars)
-    car_features = {
-        "prices": price_buckets,
-        "acceleration": acceleration_buckets,
-        "top_speed": top_speed_buckets,
-        # ... Other feature buckets ...
+"""Feature buckets for the home page filters (/car_features).
+
+Each dimension is a numeric car column plus ascending bucket edges; bucket
+i holds cars with edges[i-1] <= value < edges[i], with open-ended buckets
+below the first edge and from the last edge up. Adding a dimension is a
+new BucketDimension entry — no new code. Cars with no value for a column
+are left out of that dimension.
+
+Binning runs over the snapshot's column arrays with np.digitize, so only
+id plus the bucketed columns are read, once per catalog version.
+"""
+
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+from services.catalog import CatalogSnapshot
+
+
+class BucketDimension(NamedTuple):
+    column: str
+    edges: Tuple[float, ...]
+    labels: Tuple[str, ...]  # one more than edges
+
+
+BUCKET_DIMENSIONS: Dict[str, BucketDimension] = {
+    "prices": BucketDimension(
+        "current_price",
+        (20000, 30000, 40000, 50000, 60000, 80000, 100000, 130000, 180000, 220000),
+        (
+            "under_20k", "20_30k", "30_40k", "40_50k", "50_60k", "60_80k",
+            "80_100k", "100_130k", "130_180k", "180_220k", "over_220k",
+        ),
+    ),
+    "acceleration": BucketDimension(
+        "acceleration_0_60",
+        (2, 3, 4, 5, 6, 8, 10),
+        ("under_2s", "2_3s", "3_4s", "4_5s", "5_6s", "6_8s", "8_10s", "over_10s"),
+    ),
+    "top_speed": BucketDimension(
+        "top_speed",
+        (100, 120, 150, 180, 200),
+        ("under_100", "100_120", "120_150", "150_180", "180_200", "over_200"),
+    ),
+    "range": BucketDimension(
+        "epa_range",
+        (200, 250, 300, 350, 400),
+        ("under_200", "200_250", "250_300", "300_350", "350_400", "over_400"),
+    ),
+    "battery": BucketDimension(
+        "battery_capacity",  # kWh
+        (60, 80, 100, 120),
+        ("under_60", "60_80", "80_100", "100_120", "over_120"),
+    ),
+    "charging_speed": BucketDimension(
+        "battery_max_charging_speed",  # kW
+        (100, 150, 200, 250),
+        ("under_100", "100_150", "150_200", "200_250", "over_250"),
+    ),
+    "seats": BucketDimension(
+        "number_of_full_adult_seats",
+        (4, 5, 6, 7, 8),
+        ("under_4", "4", "5", "6", "7", "8_plus"),
+    ),
+}
+
+
+def bucket_ids(ids: np.ndarray, values: np.ndarray, dimension: BucketDimension) -> Dict[str, List[int]]:
+    """Split ids into the dimension's buckets by their aligned values."""
+    present = ~np.isnan(values)
+    ids, values = ids[present], values[present]
+    bins = np.digitize(values, dimension.edges)
+    # Stable sort keeps ids in catalog order within each bucket
+    order = np.argsort(bins, kind="stable")
+    counts = np.bincount(bins, minlength=len(dimension.labels))
+    groups = np.split(ids[order], np.cumsum(counts)[:-1])
+    return {label: group.tolist() for label, group in zip(dimension.labels, groups)}
+
+
+def bucket_cars_by_attributes(snapshot: CatalogSnapshot) -> Dict[str, Dict[str, List[int]]]:
+    return {
+        name: bucket_ids(snapshot.car_ids, snapshot.column(dimension.column), dimension)
+        for name, dimension in BUCKET_DIMENSIONS.items()
     }
-    return car_features
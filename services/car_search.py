@@ -0,0 +1,197 @@
+"""In-memory faceted search over the catalog snapshot (/cars/search).
+
+The index is columnar and aligned with snapshot.cars (position i = car i):
+
+- Range columns keep their values argsorted, so a min/max filter is two
+  binary searches plus a scatter into a boolean mask (or, when most cars
+  match, a plain vectorized comparison, which is cheaper than scattering).
+- Facet columns are dictionary-encoded; each distinct value has a
+  precomputed boolean mask (its posting list) and facet counts are one
+  bincount over the codes of the matching positions.
+
+Facet counts are disjunctive: a facet's counts apply every filter except
+its own, so selecting "SUV" still shows how many Sedans the other filters
+would match.
+
+The index is rebuilt when the snapshot changes, reusing any column whose
+values didn't change, so a price edit re-sorts only current_price.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.catalog import CatalogSnapshot
+
+RANGE_FIELDS = (
+    "current_price",
+    "epa_range",
+    "acceleration_0_60",
+    "top_speed",
+    "battery_capacity",
+)
+FACET_FIELDS = ("vehicle_class", "drive_type", "make_id", "availability_desc")
+SORT_FIELDS = RANGE_FIELDS + ("average_rating",)
+
+# Below 1/SCATTER_RATIO of the catalog, work from matching positions;
+# above it, whole-column vector ops are cheaper.
+SCATTER_RATIO = 8
+
+
+class RangeColumn:
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        # NaN (NULL) sorts last, so valid values are sorted_values[:valid]
+        self.order = np.argsort(values, kind="stable")
+        self.sorted_values = values[self.order]
+        self.valid = int(np.count_nonzero(~np.isnan(values)))
+
+    def mask(self, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        start = 0 if low is None else np.searchsorted(self.sorted_values[:self.valid], low, "left")
+        end = self.valid if high is None else np.searchsorted(
+            self.sorted_values[:self.valid], high, "right"
+        )
+        if (end - start) * SCATTER_RATIO > len(self.values):
+            mask = ~np.isnan(self.values)
+            if low is not None:
+                mask &= self.values >= low
+            if high is not None:
+                mask &= self.values <= high
+            return mask
+        mask = np.zeros(len(self.values), dtype=bool)
+        mask[self.order[start:end]] = True
+        return mask
+
+    def sort(self, positions: np.ndarray, mask: Optional[np.ndarray], descending: bool) -> np.ndarray:
+        """positions (the set bits of mask; None = all) by this column, NULLs last."""
+        if mask is None:
+            ordered, valid = self.order, self.valid
+        elif len(positions) * SCATTER_RATIO < len(self.values):
+            # Few matches: sorting them beats walking the whole order array
+            values = self.values[positions]
+            ordered = positions[np.argsort(values, kind="stable")]
+            valid = int(np.count_nonzero(~np.isnan(values)))
+        else:
+            ordered = self.order[mask[self.order]]
+            valid = len(ordered) - int(np.count_nonzero(np.isnan(self.values[ordered])))
+        if descending:
+            ordered = np.concatenate([ordered[:valid][::-1], ordered[valid:]])
+        return ordered
+
+
+class FacetColumn:
+    def __init__(self, raw: List):
+        self.raw = raw
+        self.labels = sorted({value for value in raw if value is not None})
+        # Code 0 is NULL, so counting needs no extra filtering pass
+        code_of = {value: code for code, value in enumerate(self.labels, start=1)}
+        self.codes = np.array([code_of.get(value, 0) for value in raw], dtype=np.intp)
+        self.postings = {value: self.codes == code for value, code in code_of.items()}
+        self.totals = self._counts(self.codes)
+
+    def mask(self, values: Iterable) -> np.ndarray:
+        mask = np.zeros(len(self.codes), dtype=bool)
+        for value in values:
+            posting = self.postings.get(value)
+            if posting is not None:
+                mask |= posting
+        return mask
+
+    def counts(self, positions: Optional[np.ndarray]) -> Dict:
+        """Cars per value among positions (None = the whole catalog)."""
+        if positions is None:
+            return self.totals
+        return self._counts(self.codes[positions])
+
+    def _counts(self, codes: np.ndarray) -> Dict:
+        counts = np.bincount(codes, minlength=len(self.labels) + 1)[1:]
+        return {label: int(count) for label, count in zip(self.labels, counts.tolist()) if count}
+
+
+class SearchIndex:
+    def __init__(self, size: int, ranges: Dict[str, RangeColumn], facets: Dict[str, FacetColumn]):
+        self.size = size
+        self.positions = np.arange(size)
+        self.ranges = ranges
+        self.facets = facets
+
+    def search(
+        self,
+        ranges: Dict[str, Tuple[Optional[float], Optional[float]]],
+        equals: Dict[str, Sequence],
+        sort: Optional[str] = None,
+    ) -> Tuple[np.ndarray, Dict[str, Dict]]:
+        """Matching snapshot positions (sorted) and facet counts.
+
+        ranges maps a RANGE_FIELDS name to an inclusive (min, max), either
+        end None; equals maps a FACET_FIELDS name to accepted values (OR).
+        sort is a SORT_FIELDS name, "-" prefixed for descending; default is
+        catalog (id) order.
+        """
+        range_masks = [
+            self.ranges[field].mask(low, high)
+            for field, (low, high) in ranges.items()
+            if low is not None or high is not None
+        ]
+        facet_masks = {
+            field: self.facets[field].mask(values) for field, values in equals.items() if values
+        }
+        match = _intersect(range_masks + list(facet_masks.values()))
+        matched = self.positions if match is None else np.flatnonzero(match)
+
+        facet_counts = {}
+        for field, column in self.facets.items():
+            if field not in facet_masks:
+                facet_counts[field] = column.counts(None if match is None else matched)
+                continue
+            others = _intersect(
+                range_masks + [mask for other, mask in facet_masks.items() if other != field]
+            )
+            facet_counts[field] = column.counts(None if others is None else np.flatnonzero(others))
+
+        if sort:
+            field = sort.lstrip("-")
+            ordered = self.ranges[field].sort(matched, match, descending=sort.startswith("-"))
+            return ordered, facet_counts
+        return matched, facet_counts
+
+
+def _intersect(masks: List[np.ndarray]) -> Optional[np.ndarray]:
+    """AND of masks; None (everything) when there are none."""
+    if not masks:
+        return None
+    match = masks[0]
+    for mask in masks[1:]:
+        match = match & mask
+    return match
+
+
+def build_search_index(snapshot: CatalogSnapshot, previous: Optional[SearchIndex] = None) -> SearchIndex:
+    """Index the snapshot, reusing columns unchanged since `previous`."""
+    ranges = {}
+    for field in SORT_FIELDS:
+        values = snapshot.column(field)
+        old = previous.ranges.get(field) if previous else None
+        if old is not None and np.array_equal(old.values, values, equal_nan=True):
+            ranges[field] = old
+        else:
+            ranges[field] = RangeColumn(values)
+
+    facets = {}
+    for field in FACET_FIELDS:
+        raw = [car[field] for car in snapshot.cars]
+        old = previous.facets.get(field) if previous else None
+        facets[field] = old if old is not None and old.raw == raw else FacetColumn(raw)
+    return SearchIndex(len(snapshot.cars), ranges, facets)
+
+
+_latest_index: Optional[SearchIndex] = None
+
+
+def get_search_index(snapshot: CatalogSnapshot) -> SearchIndex:
+    def build(snapshot: CatalogSnapshot) -> SearchIndex:
+        global _latest_index
+        _latest_index = build_search_index(snapshot, _latest_index)
+        return _latest_index
+
+    return snapshot.derive("search_index", build)
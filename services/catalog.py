@@ -0,0 +1,229 @@
+"""In-process snapshot of the car catalog.
+
+The catalog changes a few times a day but the card grid, model pages and
+feature buckets are read on every page view. Instead of re-querying the
+whole cars table per request, each worker keeps one snapshot of cars +
+makes (and people's names, for search) as plain dicts, tagged with a
+catalog version.
+
+- The version is (max updated_at, row count) over cars, makes and people
+  (people edits show up in search and make lineups); checked at most
+  every CATALOG_POLL_SECONDS. When it moves, the snapshot is
+  rebuilt in the background while requests keep reading the old one.
+- Write endpoints call invalidate_catalog() after commit so this worker
+  serves the change immediately; other workers pick it up on their next
+  version check.
+- Anything derived from the catalog (card lists, buckets, search indexes)
+  is memoized with CatalogSnapshot.derive() and dies with the snapshot.
+  Numeric columns are available as NumPy arrays via column().
+
+Snapshot rows are shared between requests: treat them as read-only and
+copy before changing anything.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Annotated, Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+import numpy as np
+from fastapi import Depends
+from sqlalchemy import func, select
+
+import models.orm_models as models
+from database import AsyncReadSessionLocal, AsyncSessionLocal, current_query_stats
+
+logger = logging.getLogger(__name__)
+
+CATALOG_POLL_SECONDS = float(os.getenv("CATALOG_POLL_SECONDS", "30"))
+
+# Bound on memoized values per snapshot; keys like ("model_details", slug)
+# come from the URL, so an unbounded dict would grow with junk slugs.
+DERIVED_CACHE_SIZE = 512
+
+
+class CatalogSnapshot:
+    def __init__(
+        self,
+        version: str,
+        last_modified: Optional[datetime],
+        cars: List[dict],
+        makes: List[dict],
+        people: List[dict],
+        from_primary: bool = False,
+    ):
+        self.version = version
+        # Loaded right after a local write; queries that fill derived
+        # entries should also read the primary (the replica may lag)
+        self.from_primary = from_primary
+        self.last_modified = last_modified
+        self.cars = cars
+        self.cars_by_id = {car["id"]: car for car in cars}
+        self.makes = {make["id"]: make for make in makes}
+        self.makes_by_slug = {make["slug"]: make for make in makes if make["slug"]}
+        self.people = people
+        self.cars_by_model_slug: Dict[str, List[dict]] = {}
+        for car in cars:
+            self.cars_by_model_slug.setdefault(car["make_model_slug"], []).append(car)
+        self.model_reps = [car for car in cars if car["is_model_rep"]]
+        self._derived: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def derive(self, key: Hashable, build: Callable[["CatalogSnapshot"], Any]) -> Any:
+        """Memoize build(self) under key for the lifetime of this snapshot."""
+        try:
+            self._derived.move_to_end(key)
+            return self._derived[key]
+        except KeyError:
+            pass
+        return self._store(key, build(self))
+
+    async def derive_async(
+        self, key: Hashable, build: Callable[["CatalogSnapshot"], Awaitable[Any]]
+    ) -> Any:
+        """derive() for values that need a query on top of the snapshot."""
+        try:
+            self._derived.move_to_end(key)
+            return self._derived[key]
+        except KeyError:
+            pass
+        return self._store(key, await build(self))
+
+    def _store(self, key: Hashable, value: Any) -> Any:
+        self._derived[key] = value
+        if len(self._derived) > DERIVED_CACHE_SIZE:
+            self._derived.popitem(last=False)
+        return value
+
+    @property
+    def car_ids(self) -> np.ndarray:
+        return self.derive(("column", "id"), lambda snapshot: np.array(
+            [car["id"] for car in snapshot.cars], dtype=np.int64
+        ))
+
+    def column(self, name: str) -> np.ndarray:
+        """A numeric car column as float64, aligned with self.cars; NULL -> NaN."""
+        return self.derive(("column", name), lambda snapshot: np.array(
+            [np.nan if car[name] is None else car[name] for car in snapshot.cars],
+            dtype=np.float64,
+        ))
+
+
+def _version_query():
+    cars, makes, people = models.Car, models.Make, models.Person
+    return select(
+        select(func.max(cars.updated_at)).scalar_subquery(),
+        select(func.count(cars.id)).scalar_subquery(),
+        select(func.max(makes.updated_at)).scalar_subquery(),
+        select(func.count(makes.id)).scalar_subquery(),
+        select(func.max(people.updated_at)).scalar_subquery(),
+        select(func.count(people.id)).scalar_subquery(),
+    )
+
+
+def _version_token(row) -> str:
+    return hashlib.sha1(repr(tuple(row)).encode()).hexdigest()[:16]
+
+
+class CatalogCache:
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._checked_at = 0.0
+        self._generation = 0
+        # After a local write the replica may still lag; reload from primary
+        self._reload_from_primary = False
+        self._load_lock: Optional[asyncio.Lock] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def get(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return await self._load_blocking()
+        if (
+            time.monotonic() - self._checked_at > CATALOG_POLL_SECONDS
+            and self._refresh_task is None
+        ):
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return snapshot
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._snapshot = None
+        self._reload_from_primary = True
+
+    async def _load_blocking(self) -> CatalogSnapshot:
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            return await self._load()
+
+    async def _refresh(self) -> None:
+        # Runs as its own task: keep its queries out of the request's stats
+        current_query_stats.set(None)
+        try:
+            async with AsyncReadSessionLocal() as db:
+                version = _version_token((await db.execute(_version_query())).one())
+            self._checked_at = time.monotonic()
+            if self._snapshot is None or version != self._snapshot.version:
+                await self._load()
+        except Exception:
+            # Keep serving the current snapshot; retry after the next interval
+            self._checked_at = time.monotonic()
+            logger.exception("catalog refresh failed")
+        finally:
+            self._refresh_task = None
+
+    async def _load(self) -> CatalogSnapshot:
+        generation = self._generation
+        from_primary = self._reload_from_primary
+        session_factory = AsyncSessionLocal if from_primary else AsyncReadSessionLocal
+        async with session_factory() as db:
+            version_row = (await db.execute(_version_query())).one()
+            cars = (
+                await db.execute(select(models.Car.__table__).order_by(models.Car.id))
+            ).mappings().all()
+            makes = (
+                await db.execute(select(models.Make.__table__).order_by(models.Make.id))
+            ).mappings().all()
+            people = (
+                await db.execute(
+                    select(models.Person.id, models.Person.name).order_by(models.Person.id)
+                )
+            ).mappings().all()
+
+        cars_updated, _, makes_updated, _, people_updated, _ = version_row
+        snapshot = CatalogSnapshot(
+            version=_version_token(version_row),
+            last_modified=max(
+                filter(None, (cars_updated, makes_updated, people_updated)), default=None
+            ),
+            cars=[dict(row) for row in cars],
+            makes=[dict(row) for row in makes],
+            people=[dict(row) for row in people],
+            from_primary=from_primary,
+        )
+        # A write may have invalidated us mid-load; don't install stale data
+        if generation == self._generation:
+            self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+            if from_primary:
+                self._reload_from_primary = False
+        return snapshot
+
+
+catalog = CatalogCache()
+
+
+async def get_catalog() -> CatalogSnapshot:
+    return await catalog.get()
+
+catalog_dependency = Annotated[CatalogSnapshot, Depends(get_catalog)]
+
+
+def invalidate_catalog() -> None:
+    catalog.invalidate()
@@ -0,0 +1,96 @@
+"""Side-by-side model comparison (/compare).
+
+Each model is represented by its representative trim (the one shown on the
+model page). Specs are listed in COMPARE_ROWS; rows with a direction get
+winners (every model tied for best) and deltas normalized to the best
+value, e.g. a price delta of 0.12 means 12% more expensive than the
+cheapest model compared.
+"""
+
+from typing import List, NamedTuple, Optional, Sequence
+
+from services.catalog import CatalogSnapshot
+
+MAX_COMPARE = 6
+
+
+class CompareRow(NamedTuple):
+    field: str
+    label: str
+    unit: Optional[str] = None
+    better: Optional[str] = None  # "higher", "lower", or None for unranked rows
+
+
+COMPARE_ROWS = (
+    CompareRow("current_price", "Price", "USD", "lower"),
+    CompareRow("epa_range", "EPA range", "mi", "higher"),
+    CompareRow("acceleration_0_60", "0-60 mph", "s", "lower"),
+    CompareRow("top_speed", "Top speed", "mph", "higher"),
+    CompareRow("power", "Power", "hp", "higher"),
+    CompareRow("torque", "Torque", "lb-ft", "higher"),
+    CompareRow("battery_capacity", "Battery", "kWh", "higher"),
+    CompareRow("battery_max_charging_speed", "Max charging speed", "kW", "higher"),
+    CompareRow("number_of_full_adult_seats", "Seats", None, "higher"),
+    CompareRow("frunk_capacity", "Frunk", "cu ft", "higher"),
+    CompareRow("average_rating", "Rating", "/10", "higher"),
+    CompareRow("vehicle_class", "Class"),
+    CompareRow("drive_type", "Drive"),
+)
+
+
+def _representative(snapshot: CatalogSnapshot, slug: str) -> Optional[dict]:
+    trims = snapshot.cars_by_model_slug.get(slug)
+    if not trims:
+        return None
+    return next((car for car in trims if car["is_model_rep"]), trims[0])
+
+
+def _ranked_row(row: CompareRow, values: List) -> dict:
+    present = [value for value in values if value is not None]
+    winners, deltas = [], [None] * len(values)
+    if len(present) > 1:
+        best = min(present) if row.better == "lower" else max(present)
+        winners = [index for index, value in enumerate(values) if value == best]
+        if best:
+            deltas = [
+                None if value is None else round((value - best) / abs(best), 3)
+                for value in values
+            ]
+    return {"winners": winners, "deltas": deltas}
+
+
+def build_comparison(snapshot: CatalogSnapshot, slugs: Sequence[str]) -> dict:
+    models, cars, missing = [], [], []
+    for slug in slugs:
+        car = _representative(snapshot, slug)
+        if car is None:
+            missing.append(slug)
+            continue
+        make = snapshot.makes.get(car["make_id"])
+        cars.append(car)
+        models.append({
+            "make_model_slug": slug,
+            "id": car["id"],
+            "full_slug": car["full_slug"],
+            "make_name": car["make_name"] or (make["name"] if make else None),
+            "model": car["model"],
+            "submodel": car["submodel"],
+            "image_url": car["image_url"],
+        })
+
+    rows = []
+    for row in COMPARE_ROWS:
+        values = [car[row.field] for car in cars]
+        entry = {
+            "field": row.field,
+            "label": row.label,
+            "unit": row.unit,
+            "better": row.better,
+            "values": values,
+            "winners": [],
+            "deltas": None,
+        }
+        if row.better:
+            entry.update(_ranked_row(row, values))
+        rows.append(entry)
+    return {"models": models, "missing": missing, "rows": rows}
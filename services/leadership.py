@@ -0,0 +1,107 @@
+"""Make leadership sync: founders, key personnel and CEO tenures.
+
+Leadership lives in three association tables. Instead of replacing a
+make's rows wholesale, sync_leadership() reads the current rows for every
+make being written (one query per table), diffs them against the request,
+and applies only the difference: one executemany each for deletes and
+inserts. CEO rows are whole tenures (person, start_date, end_date), so
+one person can hold several. It runs in the caller's transaction and
+never commits, so readers see either the old leadership or the new one,
+never a half-applied mix.
+
+Works for one make (PATCH /makes/{id}) or many (POST /makes/bulk) in the
+same number of statements.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, bindparam, delete, insert, select
+from sqlalchemy.orm import Session
+
+import models.orm_models as models
+
+MEMBER_COLUMNS = ("make_id", "person_id")
+CEO_COLUMNS = ("make_id", "person_id", "start_date", "end_date")
+
+# Request field -> (association table, name used in error messages)
+MEMBER_FIELDS = (
+    ("founder_ids", models.make_founders_association, "founder"),
+    ("key_personnel_ids", models.make_person_association, "key personnel"),
+)
+
+
+def _check_people(db: Session, updates) -> None:
+    """400 if any requested person id doesn't exist (one query for all)."""
+    requested: Dict[str, Set[int]] = {}
+    for _, update_ in updates:
+        for field, _, label in MEMBER_FIELDS:
+            requested.setdefault(label, set()).update(getattr(update_, field) or ())
+        requested.setdefault("CEO", set()).update(
+            ceo.person_id for ceo in update_.ceo_associations or ()
+        )
+    wanted = set().union(*requested.values())
+    if not wanted:
+        return
+    people = models.Person.__table__
+    found = set(db.execute(select(people.c.id).where(people.c.id.in_(wanted))).scalars())
+    for label, ids in requested.items():
+        if ids - found:
+            raise HTTPException(status_code=400, detail=f"One or more {label} IDs not found")
+
+
+def _sync_rows(db: Session, table, columns: Tuple[str, ...], make_ids, desired: Set[tuple]) -> Set[int]:
+    """Make table's rows for make_ids exactly the desired tuples (of columns).
+
+    Rows are compared whole, so a repeated CEO tenure is kept as its own
+    row, while exact duplicates, requested or already stored, end up as one.
+    """
+    current = Counter(db.execute(
+        select(*(table.c[column] for column in columns)).where(table.c.make_id.in_(make_ids))
+    ).tuples())
+    stale = [row for row, count in current.items() if row not in desired or count > 1]
+    added = [row for row in desired if current[row] != 1]
+    if stale:
+        # IS NOT DISTINCT FROM: open-ended tenures have NULL dates
+        db.execute(
+            delete(table).where(and_(*(
+                table.c[column].is_not_distinct_from(bindparam(f"b_{column}"))
+                for column in columns
+            ))),
+            [{f"b_{column}": value for column, value in zip(columns, row)} for row in stale],
+        )
+    if added:
+        db.execute(insert(table), [dict(zip(columns, row)) for row in sorted(added, key=repr)])
+    return {row[0] for row in stale} | {row[0] for row in added}
+
+
+def sync_leadership(db: Session, updates: Iterable[Tuple[int, object]]) -> Set[int]:
+    """Bring each make's leadership in line with its update; return changed make ids.
+
+    updates pairs a make id with anything carrying founder_ids,
+    key_personnel_ids and ceo_associations (MakeUpdate, MakeImport).
+    None leaves that part alone, as does an empty ceo_associations.
+    """
+    updates = list(updates)
+    _check_people(db, updates)
+    changed: Set[int] = set()
+    for field, table, _ in MEMBER_FIELDS:
+        requested = [(make_id, getattr(update_, field)) for make_id, update_ in updates]
+        requested = [(make_id, ids) for make_id, ids in requested if ids is not None]
+        if requested:
+            changed |= _sync_rows(
+                db, table, MEMBER_COLUMNS, {make_id for make_id, _ in requested},
+                {(make_id, person_id) for make_id, ids in requested for person_id in ids},
+            )
+    requested = [(make_id, update_.ceo_associations) for make_id, update_ in updates]
+    requested = [(make_id, ceos) for make_id, ceos in requested if ceos]
+    if requested:
+        changed |= _sync_rows(
+            db, models.make_ceo_association, CEO_COLUMNS, {make_id for make_id, _ in requested},
+            {
+                (make_id, ceo.person_id, ceo.start_date, ceo.end_date)
+                for make_id, ceos in requested for ceo in ceos
+            },
+        )
+    return changed
@@ -0,0 +1,82 @@
+"""Manufacturer lineups (/makes/by-slug/{slug}/lineup).
+
+Everything the /manufacturer/{slug} page shows, in one response: the make,
+its leadership (CEOs, founders, key personnel) and its cars as cards,
+grouped by model and then generation. The make and cards come from the
+catalog snapshot; leadership is one query over the three association
+tables, so a lineup costs a single query per make per catalog version.
+The version covers people.updated_at and makes.updated_at (which
+update_make bumps on leadership changes), so editing a person or a
+make's leadership rebuilds the lineup on every worker.
+
+Models are ordered by name; within a model the current generation (any
+trim not marked previous_generation) comes first, then older ones in the
+order their first trim was added.
+"""
+
+from typing import Dict, List
+
+from sqlalchemy import literal, select, union_all
+
+import models.orm_models as models
+from services.car_serialization import card
+from services.catalog import CatalogSnapshot
+
+LEADERSHIP_ROLES = (
+    ("ceos", models.make_ceo_association),
+    ("founders", models.make_founders_association),
+    ("key_personnel", models.make_person_association),
+)
+PERSON_FIELDS = ("id", "name", "current_company", "current_roles")
+
+
+def leadership_query(make_id: int):
+    people = models.Person.__table__
+    return union_all(*(
+        select(literal(role).label("role"), *(people.c[field] for field in PERSON_FIELDS))
+        .join_from(association, people, association.c.person_id == people.c.id)
+        .where(association.c.make_id == make_id)
+        for role, association in LEADERSHIP_ROLES
+    ))
+
+
+def _leadership(rows) -> Dict[str, List[dict]]:
+    leadership: Dict[str, Dict[int, dict]] = {role: {} for role, _ in LEADERSHIP_ROLES}
+    for row in rows:
+        leadership[row["role"]].setdefault(row["id"], {field: row[field] for field in PERSON_FIELDS})
+    return {role: [people[key] for key in sorted(people)] for role, people in leadership.items()}
+
+
+def _models(snapshot: CatalogSnapshot, make_id: int) -> List[dict]:
+    by_model: Dict[str, dict] = {}
+    for car in snapshot.cars:
+        if car["make_id"] != make_id:
+            continue
+        model = by_model.setdefault(
+            car["make_model_slug"],
+            {"make_model_slug": car["make_model_slug"], "model": car["model"], "generations": {}},
+        )
+        generation = model["generations"].setdefault(
+            car["generation"], {"generation": car["generation"], "current": False, "cars": []}
+        )
+        generation["current"] |= car["availability_desc"] != "previous_generation"
+        generation["cars"].append(card(snapshot, car))
+
+    def model_order(model: dict):
+        return ((model["model"] or "").lower(), model["make_model_slug"] or "")
+
+    lineup = []
+    for model in sorted(by_model.values(), key=model_order):
+        generations = list(model["generations"].values())
+        # Stable sort: current first, otherwise insertion (id) order
+        generations.sort(key=lambda generation: not generation["current"])
+        lineup.append({**model, "generations": generations})
+    return lineup
+
+
+def build_lineup(snapshot: CatalogSnapshot, make: dict, leadership_rows) -> dict:
+    return {
+        "make": make,
+        "leadership": _leadership(leadership_rows),
+        "models": _models(snapshot, make["id"]),
+    }
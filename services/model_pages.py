@@ -0,0 +1,191 @@
+"""Precomputed model-page documents (/cars/model-details/{make_model_slug}).
+
+A model page is the representative trim, the current trims, the make and
+the previous generations of one make_model_slug. Instead of assembling
+and validating that per view, the serialized response is kept in
+model_page_documents (migration 005) and the route reads one row by
+primary key.
+
+Documents are rebuilt on write: an after_flush listener on every Session
+collects the make_model_slugs touched by the flushed cars (old and new
+slug, so renames clear the old page) and makes, and rewrites just those
+rows in the same transaction. models/orm_models.py imports this module,
+so the listener is registered wherever the ORM is used. Writes that
+bypass the ORM (raw SQL, other services) need
+scripts/rebuild_model_pages.py afterwards.
+
+Until migration 005 has created the table, the listener logs a warning
+and skips the rebuild rather than failing every car and make write.
+A slug without a document is a 404; fill the table once migrations
+005-008 and the rating backfill have run (see migration 005).
+"""
+
+import logging
+from datetime import datetime
+from typing import Iterable, List, Optional, Set
+
+from pydantic import ValidationError
+from sqlalchemy import delete, event, insert, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+import models.orm_models as models
+from models.pydantic_models import MakeDetails, ModelDetailResponse, PreviousGeneration, SubmodelInfo
+
+cars_table = models.Car.__table__
+makes_table = models.Make.__table__
+documents_table = models.ModelPageDocument.__table__
+
+logger = logging.getLogger(__name__)
+
+
+def model_page(trims: List[dict], make: Optional[dict]) -> Optional[dict]:
+    """The model-page payload for one slug's trims (id order); None without a rep."""
+    representative_model = next((car for car in trims if car["is_model_rep"]), None)
+    if not representative_model:
+        return None
+    if not representative_model["make_name"] and make:
+        representative_model = {**representative_model, "make_name": make["name"]}
+
+    current_submodels = []
+    prev_gen_map = {}
+
+    for car in trims:
+        info = SubmodelInfo(**{field: car[field] for field in SubmodelInfo.model_fields})
+        if car["availability_desc"] == "previous_generation":
+            gen_key = car["generation"] or "Earlier Generation"
+            if gen_key not in prev_gen_map:
+                prev_gen_map[gen_key] = {"image_url": car["image_url"], "submodels": []}
+            prev_gen_map[gen_key]["submodels"].append(info)
+        else:
+            current_submodels.append(info)
+
+    previous_generations = [
+        PreviousGeneration(
+            generation=gen_key,
+            image_url=data["image_url"],
+            submodels=data["submodels"],
+        )
+        for gen_key, data in prev_gen_map.items()
+    ]
+
+    return {
+        "representative_model": representative_model,
+        "submodels": current_submodels,
+        "make_details": MakeDetails.model_validate(make) if make else None,
+        "previous_generations": previous_generations,
+    }
+
+
+def last_modified(trims: List[dict], make: Optional[dict]) -> Optional[datetime]:
+    stamps = [car["updated_at"] for car in trims] + [make["updated_at"] if make else None]
+    return max(filter(None, stamps), default=None)
+
+
+def _load(connection: Connection, make_model_slug: str):
+    rows = connection.execute(
+        select(cars_table).where(cars_table.c.make_model_slug == make_model_slug).order_by(cars_table.c.id)
+    ).mappings().all()
+    trims = [dict(row) for row in rows]
+    make = None
+    if trims:
+        make = connection.execute(
+            select(makes_table).where(makes_table.c.id == trims[0]["make_id"])
+        ).mappings().first()
+    return trims, dict(make) if make else None
+
+
+def render(trims: List[dict], make: Optional[dict]) -> Optional[bytes]:
+    """Serialized ModelDetailResponse for one slug, or None if it has no rep."""
+    page = model_page(trims, make)
+    if page is None:
+        return None
+    return ModelDetailResponse.model_validate(page).model_dump_json().encode()
+
+
+def rebuild_model_pages(connection: Connection, slugs: Iterable[str]) -> None:
+    """Rewrite the documents for slugs from the current (flushed) rows.
+
+    A slug whose rows don't fit the response model loses its document
+    (the page 404s until its data is fixed) rather than failing the write.
+    """
+    for make_model_slug in slugs:
+        trims, make = _load(connection, make_model_slug)
+        try:
+            document = render(trims, make)
+        except ValidationError:
+            logger.exception("model page %s not rebuilt", make_model_slug)
+            document = None
+        connection.execute(
+            delete(documents_table).where(documents_table.c.make_model_slug == make_model_slug)
+        )
+        if document is not None:
+            connection.execute(insert(documents_table).values(
+                make_model_slug=make_model_slug,
+                document=document.decode(),
+                updated_at=last_modified(trims, make) or datetime.utcnow(),
+            ))
+
+
+def all_model_slugs(connection: Connection) -> List[str]:
+    return list(connection.execute(
+        select(cars_table.c.make_model_slug).where(cars_table.c.make_model_slug.isnot(None)).distinct()
+    ).scalars())
+
+
+def _touched_slugs(session: Session) -> Set[str]:
+    slugs: Set[str] = set()
+    make_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.Car):
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            history = inspect(obj).attrs.make_model_slug.history
+            slugs.update(history.added or ())
+            slugs.update(history.deleted or ())
+            slugs.update(history.unchanged or ())
+        elif isinstance(obj, models.Make):
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            if obj.id is not None:
+                make_ids.add(obj.id)
+    if make_ids:
+        slugs.update(session.connection().execute(
+            select(cars_table.c.make_model_slug).where(cars_table.c.make_id.in_(make_ids)).distinct()
+        ).scalars())
+    slugs.discard(None)
+    return slugs
+
+
+_documents_table_exists = False
+
+
+def _has_documents_table(connection: Connection) -> bool:
+    global _documents_table_exists
+    if not _documents_table_exists:
+        _documents_table_exists = inspect(connection).has_table(documents_table.name)
+        if not _documents_table_exists:
+            logger.warning(
+                "model_page_documents missing (run migration 005); model pages not rebuilt"
+            )
+    return _documents_table_exists
+
+
+@event.listens_for(Session, "after_flush")
+def _rebuild_touched_model_pages(session: Session, flush_context) -> None:
+    slugs = _touched_slugs(session)
+    if slugs and _has_documents_table(session.connection()):
+        rebuild_model_pages(session.connection(), sorted(slugs))
+
+
+async def read_model_page(db, make_model_slug: str):
+    """(document bytes, updated_at) for a slug, or (None, None) without a document."""
+    row = (
+        await db.execute(
+            select(documents_table.c.document, documents_table.c.updated_at)
+            .where(documents_table.c.make_model_slug == make_model_slug)
+        )
+    ).first()
+    if row is None:
+        return None, None
+    return row.document.encode(), row.updated_at
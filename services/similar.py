@@ -0,0 +1,146 @@
+"""Similar-EV recommendations (/cars/{car_id}/similar).
+
+Every model rep gets a spec vector: price (log scale), EPA range, 0-60,
+seats and battery standardized to z-scores, plus a one-hot vehicle class.
+Missing specs are imputed as the average (z = 0) so they neither attract
+nor repel. Neighbours are by weighted Euclidean distance and are computed
+for all reps in one batch; other trims are matched against the rep matrix
+on request (one matrix-vector product). Other trims of the same model are
+never suggested.
+
+The index is rebuilt per catalog version, but only recomputed when the
+rep set or their specs changed; edits to descriptions, images and the
+like reuse the previous neighbours.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.catalog import CatalogSnapshot
+
+MAX_NEIGHBOURS = 20
+BATCH_ROWS = 512
+
+# (column, weight, log scale)
+NUMERIC_FEATURES = (
+    ("current_price", 1.5, True),
+    ("epa_range", 1.0, False),
+    ("acceleration_0_60", 1.0, False),
+    ("number_of_full_adult_seats", 1.0, False),
+    ("battery_capacity", 0.75, False),
+)
+VEHICLE_CLASS_WEIGHT = 1.5
+
+
+def _raw_features(snapshot: CatalogSnapshot) -> Tuple[np.ndarray, List[Optional[str]]]:
+    """Numeric spec columns (cars x features, NaN for NULL) and vehicle classes."""
+    columns = []
+    for field, _, log_scale in NUMERIC_FEATURES:
+        values = snapshot.column(field)
+        if log_scale:
+            values = np.log(np.where(values > 0, values, np.nan))
+        columns.append(values)
+    classes = [(car["vehicle_class"] or "").strip().lower() or None for car in snapshot.cars]
+    return np.column_stack(columns), classes
+
+
+class SimilarIndex:
+    def __init__(self, raw: np.ndarray, classes: List[Optional[str]], snapshot: CatalogSnapshot):
+        self.raw = raw
+        self.classes = classes
+        self.car_ids = snapshot.car_ids
+        self.model_slugs = np.array([car["make_model_slug"] or "" for car in snapshot.cars])
+        self.position = {int(car_id): position for position, car_id in enumerate(self.car_ids)}
+        self.reps = np.flatnonzero([car["is_model_rep"] for car in snapshot.cars])
+
+        # Standardize against the reps, ignoring missing values
+        rep_raw = raw[self.reps]
+        present = ~np.isnan(rep_raw)
+        count = np.maximum(present.sum(axis=0), 1)
+        self.mean = np.where(present, rep_raw, 0).sum(axis=0) / count
+        variance = (np.where(present, rep_raw - self.mean, 0) ** 2).sum(axis=0) / count
+        self.std = np.where(variance > 0, np.sqrt(variance), 1.0)
+        self.class_labels = sorted({cls for cls in classes if cls})
+
+        self.vectors = self._vectors(np.arange(len(raw)))
+        self.rep_vectors = self.vectors[self.reps]
+        self.rep_norms = (self.rep_vectors ** 2).sum(axis=1)
+        self.rep_neighbours = self._batch_neighbours()
+
+    def _vectors(self, positions: np.ndarray) -> np.ndarray:
+        weights = np.array([weight for _, weight, _ in NUMERIC_FEATURES])
+        numeric = np.nan_to_num((self.raw[positions] - self.mean) / self.std) * weights
+        one_hot = np.zeros((len(positions), len(self.class_labels)))
+        column = {label: index for index, label in enumerate(self.class_labels)}
+        for row, position in enumerate(positions):
+            cls = self.classes[position]
+            if cls:
+                one_hot[row, column[cls]] = VEHICLE_CLASS_WEIGHT / np.sqrt(2)
+        return np.hstack([numeric, one_hot])
+
+    def _distances(self, vectors: np.ndarray) -> np.ndarray:
+        """Squared distances from each of vectors to every rep."""
+        norms = (vectors ** 2).sum(axis=1)[:, None]
+        return np.maximum(norms + self.rep_norms[None, :] - 2 * vectors @ self.rep_vectors.T, 0)
+
+    def _nearest(self, distances: np.ndarray, position: int) -> List[Tuple[int, float]]:
+        distances = np.where(self.model_slugs[self.reps] == self.model_slugs[position], np.inf, distances)
+        k = min(MAX_NEIGHBOURS, len(distances))
+        if k == 0:
+            return []
+        candidates = np.argpartition(distances, k - 1)[:k]
+        candidates = candidates[np.argsort(distances[candidates], kind="stable")]
+        return [
+            (int(self.reps[rep]), float(np.sqrt(distances[rep])))
+            for rep in candidates
+            if np.isfinite(distances[rep])
+        ]
+
+    def _batch_neighbours(self) -> Dict[int, List[Tuple[int, float]]]:
+        neighbours = {}
+        # Chunked so the distance block stays small for large catalogs
+        for start in range(0, len(self.reps), BATCH_ROWS):
+            chunk = self.reps[start:start + BATCH_ROWS]
+            distances = self._distances(self.rep_vectors[start:start + BATCH_ROWS])
+            for row, position in enumerate(chunk):
+                neighbours[int(position)] = self._nearest(distances[row], position)
+        return neighbours
+
+    def neighbours(self, car_id: int, k: int) -> Optional[List[Tuple[int, float]]]:
+        """(snapshot position, distance) of the k most similar reps; None if unknown."""
+        position = self.position.get(car_id)
+        if position is None:
+            return None
+        if position in self.rep_neighbours:
+            return self.rep_neighbours[position][:k]
+        if not len(self.reps):
+            return []
+        distances = self._distances(self.vectors[[position]])[0]
+        return self._nearest(distances, position)[:k]
+
+
+def build_similar_index(snapshot: CatalogSnapshot, previous: Optional[SimilarIndex] = None) -> SimilarIndex:
+    raw, classes = _raw_features(snapshot)
+    if (
+        previous is not None
+        and np.array_equal(previous.car_ids, snapshot.car_ids)
+        and np.array_equal(previous.raw, raw, equal_nan=True)
+        and previous.classes == classes
+        and np.array_equal(previous.reps, np.flatnonzero([car["is_model_rep"] for car in snapshot.cars]))
+        and previous.model_slugs.tolist() == [car["make_model_slug"] or "" for car in snapshot.cars]
+    ):
+        return previous
+    return SimilarIndex(raw, classes, snapshot)
+
+
+_latest_index: Optional[SimilarIndex] = None
+
+
+def get_similar_index(snapshot: CatalogSnapshot) -> SimilarIndex:
+    def build(snapshot: CatalogSnapshot) -> SimilarIndex:
+        global _latest_index
+        _latest_index = build_similar_index(snapshot, _latest_index)
+        return _latest_index
+
+    return snapshot.derive("similar_index", build)
@@ -0,0 +1,162 @@
+"""Typeahead suggestions over makes, models, trims and people.
+
+Built from the catalog snapshot, so it refreshes with the catalog version.
+Every suggestion label (e.g. "Hyundai Ioniq 5 Limited") is split into
+lowercase alphanumeric tokens; a query token matches a suggestion when
+it is one of its tokens, a prefix of one (via a trie over all tokens), or
+- for tokens of 3+ characters with neither - a close spelling found
+through a trigram index ("ionic" -> "ioniq").
+
+Suggestions must match every query token; if none do, the ones matching
+the most tokens are returned. Within that, exact beats prefix beats fuzzy,
+and makes rank above models above trims and people.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from services.catalog import CatalogSnapshot
+
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.75
+FUZZY_WEIGHT = 0.6  # times trigram similarity
+MIN_FUZZY_SIMILARITY = 0.3
+MIN_FUZZY_LENGTH = 3
+TYPE_RANK = {"make": 3, "model": 2, "trim": 1, "person": 1}
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    # Fold accents so "jose munoz" finds "José Muñoz"
+    folded = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode()
+    return re.findall(r"[a-z0-9]+", folded.lower())
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _TrieNode:
+    __slots__ = ("children", "entries")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.entries: Set[int] = set()
+
+
+class SuggestIndex:
+    def __init__(self, suggestions: List[dict]):
+        self.suggestions = suggestions
+        self.postings: Dict[str, Set[int]] = defaultdict(set)
+        for entry_id, suggestion in enumerate(suggestions):
+            for token in tokenize(suggestion["label"]):
+                self.postings[token].add(entry_id)
+
+        self.trie = _TrieNode()
+        self.by_trigram: Dict[str, Set[str]] = defaultdict(set)
+        for token, entries in self.postings.items():
+            node = self.trie
+            for char in token:
+                node = node.children.setdefault(char, _TrieNode())
+                node.entries |= entries
+            for gram in trigrams(token):
+                self.by_trigram[gram].add(token)
+
+    def _prefix_entries(self, prefix: str) -> Set[int]:
+        node = self.trie
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.entries
+
+    def _fuzzy_tokens(self, token: str) -> Dict[str, float]:
+        grams = trigrams(token)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for candidate in self.by_trigram.get(gram, ()):
+                shared[candidate] += 1
+        similar = {}
+        for candidate, count in shared.items():
+            similarity = count / (len(grams) + len(trigrams(candidate)) - count)
+            if similarity >= MIN_FUZZY_SIMILARITY:
+                similar[candidate] = similarity
+        return similar
+
+    def _token_scores(self, token: str) -> Dict[int, float]:
+        scores = dict.fromkeys(self._prefix_entries(token), PREFIX_SCORE)
+        for entry_id in self.postings.get(token, ()):
+            scores[entry_id] = EXACT_SCORE
+        if not scores and len(token) >= MIN_FUZZY_LENGTH:
+            for candidate, similarity in self._fuzzy_tokens(token).items():
+                for entry_id in self.postings[candidate]:
+                    scores[entry_id] = max(scores.get(entry_id, 0.0), FUZZY_WEIGHT * similarity)
+        return scores
+
+    def suggest(self, query: str, limit: int = 10) -> List[dict]:
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        matched: Dict[int, int] = defaultdict(int)
+        totals: Dict[int, float] = defaultdict(float)
+        for token in dict.fromkeys(tokens):
+            for entry_id, score in self._token_scores(token).items():
+                matched[entry_id] += 1
+                totals[entry_id] += score
+        if not matched:
+            return []
+
+        best = max(matched.values())
+        ranked = sorted(
+            (entry_id for entry_id, count in matched.items() if count == best),
+            key=lambda entry_id: (
+                -totals[entry_id],
+                -TYPE_RANK[self.suggestions[entry_id]["type"]],
+                len(self.suggestions[entry_id]["label"]),
+                self.suggestions[entry_id]["label"],
+            ),
+        )
+        return [
+            {**self.suggestions[entry_id], "score": round(totals[entry_id] / len(tokens), 3)}
+            for entry_id in ranked[:limit]
+        ]
+
+
+def _label(*parts: Optional[str]) -> str:
+    return " ".join(part for part in parts if part)
+
+
+def build_suggest_index(snapshot: CatalogSnapshot) -> SuggestIndex:
+    suggestions = []
+    for make in snapshot.makes.values():
+        if make["name"]:
+            suggestions.append({"type": "make", "id": make["id"], "label": make["name"]})
+
+    for slug, trims in snapshot.cars_by_model_slug.items():
+        car = next((car for car in trims if car["is_model_rep"]), trims[0])
+        make = snapshot.makes.get(car["make_id"])
+        make_name = car["make_name"] or (make["name"] if make else None)
+        if slug:
+            suggestions.append({
+                "type": "model",
+                "label": _label(make_name, car["model"]),
+                "slug": slug,
+            })
+        for trim in trims:
+            suggestions.append({
+                "type": "trim",
+                "id": trim["id"],
+                "label": _label(make_name, trim["model"], trim["submodel"]),
+                "slug": trim["full_slug"],
+            })
+
+    for person in snapshot.people:
+        suggestions.append({"type": "person", "id": person["id"], "label": person["name"]})
+    return SuggestIndex(suggestions)
+
+
+def get_suggest_index(snapshot: CatalogSnapshot) -> SuggestIndex:
+    return snapshot.derive("suggest_index", build_suggest_index)
@@ -0,0 +1,78 @@
+"""Keyset (cursor) pagination.
+
+A cursor is an opaque token holding the sort key and id of the last row of
+the previous page; the next page is "rows after that key" in the listing's
+order, which an index answers without scanning the skipped rows, and which
+doesn't shift when rows are inserted earlier in the order.
+
+List endpoints keep skip/limit for compatibility. When a page is full,
+the cursor for the next one goes out in X-Next-Cursor (and a Link
+rel="next" header) for endpoints that return a bare list, or as
+next_cursor in the body for endpoints that return an object.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, Request
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*key: Any) -> str:
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in key]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """The key a cursor holds; 400 if it isn't a `size`-part cursor we issued."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except ValueError:
+        key = None
+    if not isinstance(key, list) or len(key) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+
+def cursor_id(cursor: Optional[str]) -> Optional[int]:
+    """The id from an id-ordered listing's cursor, if one was given."""
+    if not cursor:
+        return None
+    (last_id,) = decode_cursor(cursor, 1)
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_id
+
+
+def check_paging(skip: int, cursor: Optional[str]) -> None:
+    if cursor and skip:
+        raise HTTPException(status_code=400, detail="Use either skip or cursor, not both")
+
+
+def after_key(columns: Sequence, key: Sequence, descending: bool = False):
+    """WHERE clause for rows strictly after `key` in ORDER BY columns."""
+    if len(columns) == 1:
+        return columns[0] < key[0] if descending else columns[0] > key[0]
+    row = tuple_(*columns)
+    return row < tuple_(*key) if descending else row > tuple_(*key)
+
+
+def parse_datetime(value: Any) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def next_page_headers(request: Request, cursor: Optional[str]) -> Dict[str, str]:
+    """Headers advertising the next page of a bare-list response."""
+    if cursor is None:
+        return {}
+    next_url = request.url.remove_query_params(["skip", "cursor"]).include_query_params(cursor=cursor)
+    return {NEXT_CURSOR_HEADER: cursor, "Link": f'<{next_url}>; rel="next"'}
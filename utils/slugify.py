@@ -8,3 +8,10 @@ def slugify(*args):
     slug = "-".join(arg.lower() for arg in args if arg)
     slug = re.sub(r"[^a-z0-9-]+", "-", slug).strip("-")
     return slug
+
+
+def make_name_to_slug(name: str) -> str:
+    """Mirror of frontend makeNameToSlug (src/utils/makeSlug.ts):
+    lowercase, whitespace -> '-', strip everything but [a-z0-9-]."""
+    slug = re.sub(r"\s+", "-", (name or "").lower())
+    return re.sub(r"[^a-z0-9-]", "", slug)